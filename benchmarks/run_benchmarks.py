@@ -0,0 +1,239 @@
+"""
+Reproducible benchmarks for the schedulers, RL training/inference and Q-table I/O.
+
+    python benchmarks/run_benchmarks.py --out results.json
+    python benchmarks/run_benchmarks.py --sizes 10 1000 100000 --distributions uniform heavy
+    python benchmarks/run_benchmarks.py --out new.json --compare baseline.json --tolerance 1.25
+
+Every workload is generated from a fixed seed, each case keeps the best of
+--repeat timed runs, and results go to JSON. With --compare, cases that got
+slower than baseline * tolerance are reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from process import Process, ProcessTable
+from scheduler.fcfs import fcfs
+from scheduler.sjf import sjf
+from scheduler.round_robin import round_robin
+from scheduler.priority import priority_scheduling
+from scheduler.rl_scheduler import RLScheduler
+from scheduler.q_table import QTable
+from scheduler.q_table_format import MappedQTable, save_q_table
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+DISTRIBUTIONS = ("uniform", "poisson", "heavy", "batch")
+DEFAULT_QUANTA = [1, 6, 20]
+DEFAULT_Q_TABLE_STATES = [1000, 100000]
+
+
+def make_workload(n, distribution, seed=0):
+    """
+    Columns for n processes. Load is kept near 1 so queues neither drain nor explode,
+    except for batch:
+    uniform: arrivals and bursts uniform (like data/*.csv)
+    poisson: exponential inter-arrival times, geometric bursts
+    heavy:   exponential inter-arrival times, Pareto (alpha=1.5) bursts
+    batch:   everything arrives at 0, bursts uniform (one long queue that drains)
+    """
+    rng = np.random.default_rng(seed)
+    if distribution == "uniform":
+        burst = rng.integers(1, 20, n)
+        arrival = rng.integers(0, max(int(burst.sum()), 1), n)
+    elif distribution == "poisson":
+        burst = rng.geometric(1 / 10, n)
+        arrival = np.cumsum(rng.exponential(10, n)).astype(np.int64)
+    elif distribution == "heavy":
+        burst = np.minimum((rng.pareto(1.5, n) + 1) * 4, 10000).astype(np.int64)
+        arrival = np.cumsum(rng.exponential(burst.mean(), n)).astype(np.int64)
+    elif distribution == "batch":
+        burst = rng.integers(1, 20, n)
+        arrival = np.zeros(n, dtype=np.int64)
+    else:
+        raise ValueError(f"Unknown distribution {distribution!r}")
+    priority = rng.integers(1, 6, n)
+    return {"pid": np.arange(n), "arrival": np.asarray(arrival, dtype=np.int64),
+            "burst": np.asarray(burst, dtype=np.int64), "priority": priority}
+
+
+def build(columns, form):
+    table = ProcessTable.from_columns(columns)
+    if form == "table":
+        return table
+    return table.to_processes()
+
+
+def timed(fn, setup, repeat):
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def scheduler_cases(quanta):
+    cases = [("fcfs", {}, fcfs), ("sjf", {}, sjf), ("priority", {}, priority_scheduling)]
+    for q in quanta:
+        cases.append(("round_robin", {"quantum": q}, lambda p, q=q: round_robin(p, quantum=q)))
+        cases.append(("round_robin_compressed", {"quantum": q},
+                      lambda p, q=q: round_robin(p, quantum=q, compress=True)))
+    return cases
+
+
+def random_q_table(n_states, seed=0):
+    rng = np.random.default_rng(seed)
+    table = QTable(capacity=n_states)
+    states = rng.integers(0, 100, (n_states, 8))
+    states[:, 1] = rng.integers(1, 30, n_states)
+    for state in map(tuple, states.tolist()):
+        table[state] = rng.standard_normal(state[1])
+    return table
+
+
+def run(args):
+    results = []
+
+    def record(name, size, distribution, params, times):
+        results.append({
+            "name": name, "size": size, "distribution": distribution, "params": params,
+            "best": min(times), "median": float(np.median(times)), "times": times,
+        })
+        label = f"{name}{params or ''}"
+        print(f"{label:<32} n={size:<8} {distribution:<8} best={min(times):.4f}s", flush=True)
+
+    for distribution in args.distributions:
+        for size in args.sizes:
+            columns = make_workload(size, distribution, seed=args.seed)
+
+            for name, params, fn in scheduler_cases(args.quanta):
+                times = timed(fn, lambda: build(columns, args.form), args.repeat)
+                record(name, size, distribution, params, times)
+
+            if size <= args.rl_max_size:
+                params = {"episodes": args.rl_episodes}
+
+                def train(rl):
+                    random.seed(args.seed)
+                    rl.train()
+                times = timed(train, lambda: RLScheduler(build(columns, args.form), episodes=args.rl_episodes),
+                              args.repeat)
+                record("rl_train", size, distribution, params, times)
+
+                if not args.skip_batched:
+                    times = timed(lambda rl: rl.train_batched(seed=args.seed),
+                                  lambda: RLScheduler(build(columns, args.form), episodes=args.rl_episodes),
+                                  args.repeat)
+                    record("rl_train_batched", size, distribution, params, times)
+
+                random.seed(args.seed)
+                trained = RLScheduler(build(columns, args.form), episodes=args.rl_episodes)
+                trained.train()
+                times = timed(lambda rl: rl.schedule(), lambda: trained, args.repeat)
+                record("rl_schedule", size, distribution, params, times)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_states in args.q_table_states:
+            table = random_q_table(n_states, seed=args.seed)
+            path = os.path.join(tmp, f"q_{n_states}.qtb")
+            record("q_table_save", n_states, "-", {}, timed(lambda t: save_q_table(t, path), lambda: table, args.repeat))
+            record("q_table_load_mmap", n_states, "-", {}, timed(MappedQTable, lambda: path, args.repeat))
+            record("q_table_load_full", n_states, "-", {},
+                   timed(lambda p: MappedQTable(p).to_qtable(), lambda: path, args.repeat))
+            if n_states <= args.yaml_max_states:
+                rl = RLScheduler([])
+                rl.q_table = table
+                yaml_path = os.path.join(tmp, f"q_{n_states}.yaml")
+                record("q_table_save_yaml", n_states, "-", {},
+                       timed(lambda p: rl.save_q_table_yaml(p), lambda: yaml_path, args.repeat))
+                record("q_table_load_yaml", n_states, "-", {},
+                       timed(lambda p: rl.load_q_table_yaml(p), lambda: yaml_path, args.repeat))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+def case_key(result):
+    return (result["name"], result["size"], result["distribution"], json.dumps(result["params"], sort_keys=True))
+
+
+def compare(current, baseline, tolerance, min_seconds=1e-3):
+    """Return (case, baseline best, current best) for every case slower than baseline * tolerance."""
+    previous = {case_key(r): r["best"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = case_key(result)
+        if key not in previous:
+            continue
+        # Ignore cases too short to time reliably
+        if result["best"] > previous[key] * tolerance and result["best"] > min_seconds:
+            regressions.append((key, previous[key], result["best"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--quanta", type=int, nargs="+", default=DEFAULT_QUANTA)
+    parser.add_argument("--form", choices=("list", "table"), default="list",
+                        help="pass workloads as lists of Process objects or as a ProcessTable")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rl-episodes", type=int, default=20)
+    parser.add_argument("--rl-max-size", type=int, default=10000, help="skip RL cases above this workload size")
+    parser.add_argument("--skip-batched", action="store_true", help="skip the batched RL training case")
+    parser.add_argument("--q-table-states", type=int, nargs="+", default=DEFAULT_Q_TABLE_STATES)
+    parser.add_argument("--yaml-max-states", type=int, default=10000)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="allowed slowdown factor for --compare")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = run(args)
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nWrote {len(current['results'])} results to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for (name, size, distribution, params), before, after in regressions:
+            print(f"REGRESSION {name} {params} n={size} {distribution}: {before:.4f}s -> {after:.4f}s "
+                  f"({after / before:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance}x against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
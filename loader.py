@@ -0,0 +1,170 @@
+"""
+Columnar workload loading.
+
+A workload is a dict of equal-length NumPy arrays keyed by COLUMNS. Supported
+files are `pid,arrival,burst,priority` CSVs (read in chunks by the pandas C
+parser), `.npy` structured arrays (memory-mapped), `.npz` archives with one
+array per column and, when pyarrow is installed, Parquet.
+
+CSV, .npy and Parquet are streamed chunk by chunk; .npz members cannot be
+memory-mapped, so those columns are read whole.
+"""
+
+import os
+
+import numpy as np
+
+from process import Process
+
+COLUMNS = ("pid", "arrival", "burst", "priority")
+DTYPE = np.dtype([(name, np.int64) for name in COLUMNS])
+DEFAULT_CHUNK_ROWS = 1 << 20
+_EXTENSIONS = {".npy": "npy", ".npz": "npz", ".parquet": "parquet", ".pq": "parquet"}
+# Every extension a workload file may have; anything else is read as CSV
+WORKLOAD_EXTENSIONS = (".csv",) + tuple(_EXTENSIONS)
+
+
+def detect_format(path):
+    """Workload file format of path from its extension: csv (the default), npy, npz or parquet."""
+    return _EXTENSIONS.get(os.path.splitext(str(path))[1].lower(), "csv")
+
+
+def columns_from_frame(df):
+    """Typed column arrays from a DataFrame; priority defaults to 0 when absent."""
+    n = len(df)
+    columns = {}
+    for name in COLUMNS:
+        if name in df.columns:
+            columns[name] = df[name].to_numpy(dtype=np.int64)
+        else:
+            columns[name] = np.zeros(n, dtype=np.int64)
+    return columns
+
+
+def _iter_csv_chunks(path, chunk_rows):
+    import pandas as pd
+
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [name for name in COLUMNS if name in header]
+    reader = pd.read_csv(path, usecols=usecols, dtype={name: np.int64 for name in usecols},
+                         engine="c", chunksize=chunk_rows)
+    for chunk in reader:
+        yield columns_from_frame(chunk)
+
+
+def _iter_npy_chunks(path, chunk_rows):
+    data = np.load(path, mmap_mode="r")
+    for start in range(0, len(data), chunk_rows):
+        part = data[start:start + chunk_rows]
+        yield {name: np.array(part[name], dtype=np.int64) for name in COLUMNS}
+
+
+def _iter_npz_chunks(path, chunk_rows):
+    with np.load(path) as archive:
+        data = {name: archive[name] for name in COLUMNS if name in archive}
+    n = len(data["pid"])
+    for start in range(0, n, chunk_rows):
+        yield {name: np.asarray(data[name][start:start + chunk_rows], dtype=np.int64)
+               if name in data else np.zeros(min(chunk_rows, n - start), dtype=np.int64)
+               for name in COLUMNS}
+
+
+def _iter_parquet_chunks(path, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet workloads requires pyarrow") from None
+
+    parquet = pq.ParquetFile(path)
+    usecols = [name for name in COLUMNS if name in parquet.schema.names]
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=usecols):
+        n = batch.num_rows
+        yield {name: batch.column(usecols.index(name)).to_numpy().astype(np.int64)
+               if name in usecols else np.zeros(n, dtype=np.int64)
+               for name in COLUMNS}
+
+
+_READERS = {
+    "csv": _iter_csv_chunks,
+    "npy": _iter_npy_chunks,
+    "npz": _iter_npz_chunks,
+    "parquet": _iter_parquet_chunks,
+}
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield column dicts of at most chunk_rows rows, in file order."""
+    return _READERS[detect_format(path)](path, chunk_rows)
+
+
+def load_columns(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Read a whole workload into typed column arrays."""
+    if detect_format(path) == "npy":
+        data = np.load(path, mmap_mode="r")
+        return {name: data[name] for name in COLUMNS}
+    chunks = list(iter_chunks(path, chunk_rows))
+    if not chunks:
+        return {name: np.zeros(0, dtype=np.int64) for name in COLUMNS}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS}
+
+
+def save_columns(columns, path):
+    """Write columns as a structured .npy (memory-mappable) or a .npz archive."""
+    if detect_format(path) == "npz":
+        np.savez(path, **{name: np.asarray(columns[name], dtype=np.int64) for name in COLUMNS})
+        return
+    data = np.empty(len(columns["pid"]), dtype=DTYPE)
+    for name in COLUMNS:
+        data[name] = columns[name]
+    np.save(path, data)
+
+
+def write_csv_chunks(chunks, path):
+    """Stream column chunks to a pid,arrival,burst,priority CSV. Returns the number of rows written."""
+    import pandas as pd
+
+    rows = 0
+    with open(path, "w", newline="") as f:
+        f.write(",".join(COLUMNS) + "\n")
+        for chunk in chunks:
+            pd.DataFrame(chunk, columns=list(COLUMNS)).to_csv(f, header=False, index=False)
+            rows += len(chunk["pid"])
+    return rows
+
+
+def processes_from_columns(columns):
+    return [
+        Process(pid=pid, arrival=arrival, burst=burst, priority=priority)
+        for pid, arrival, burst, priority in zip(*(np.asarray(columns[name]).tolist() for name in COLUMNS))
+    ]
+
+
+def load_processes(path):
+    return processes_from_columns(load_columns(path))
+
+
+def iter_arrival_batches(path, batch_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Stream a workload as column batches in arrival order, holding one chunk at a time.
+
+    Each chunk is stably sorted by arrival. The file must already be in
+    non-decreasing arrival order across chunks (as written by the workload
+    generator or trace ingestion); a chunk that starts before the previous one
+    ended raises ValueError rather than silently reordering.
+    """
+    last_arrival = None
+    for chunk in iter_chunks(path, batch_rows):
+        if not len(chunk["arrival"]):
+            continue
+        order = np.argsort(chunk["arrival"], kind="stable")
+        chunk = {name: chunk[name][order] for name in COLUMNS}
+        if last_arrival is not None and chunk["arrival"][0] < last_arrival:
+            raise ValueError(f"{path} is not sorted by arrival; load it with load_columns instead")
+        last_arrival = chunk["arrival"][-1]
+        yield chunk
+
+
+def iter_process_batches(path, batch_rows=DEFAULT_CHUNK_ROWS):
+    """iter_arrival_batches, yielding lists of Process objects."""
+    for chunk in iter_arrival_batches(path, batch_rows):
+        yield processes_from_columns(chunk)
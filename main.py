@@ -1,60 +1,180 @@
 # main.py
+"""
+Headless batch runner: every workload x algorithm x parameter combination,
+spread over a process pool, with one metrics row per run.
 
-import pandas as pd
-from process import Process
-from scheduler.fcfs import fcfs
-from scheduler.sjf import sjf
-from scheduler.round_robin import round_robin
-from scheduler.priority import priority_scheduling
-from scheduler.rl_scheduler import RLScheduler
-from visualizer import plot_gantt_chart, print_process_metrics
-
-
-def load_processes_from_csv(file_path):
-    df = pd.read_csv(file_path)
-    processes = [
-        Process(
-            pid=int(row['pid']),
-            arrival=int(row['arrival']),
-            burst=int(row['burst']),
-            priority=int(row['priority'])
-        )
-        for _, row in df.iterrows()
-    ]
-    return processes
-
-
-def main():
-    print("Select Scheduling Algorithm:")
-    print("1. FCFS")
-    print("2. SJF")
-    print("3. Round Robin")
-    print("4. Priority")
-    print("5. Reinforcement Learning")
-
-    choice = int(input("Enter choice number: "))
-    processes = load_processes_from_csv("data/rl_process_dataset_100.csv")
-
-    if choice == 1:
-        scheduled, gantt = fcfs(processes)
-    elif choice == 2:
-        scheduled, gantt = sjf(processes)
-    elif choice == 3:
-        quantum = int(input("Enter quantum time for Round Robin: "))
-        scheduled, gantt = round_robin(processes, quantum=quantum)
-    elif choice == 4:
-        scheduled, gantt = priority_scheduling(processes)
-    elif choice == 5:
-        rl = RLScheduler(processes)
-        print("Training RL Scheduler...")
-        rl.train()
-        scheduled, gantt = rl.schedule()
-    else:
-        print("Invalid choice")
+    python main.py data/*.csv --algorithms fcfs sjf rr --quantum 2 6 --out results.csv
+    python main.py traces/ --algorithms rl --q-table general_q_table.qtb --cores 1 4 --out nightly.json
+    python main.py data/rl_process_dataset_100.csv --algorithms sjf --plot
+
+Workloads are files readable by loader.py; directories are expanded to the
+workload files inside them. --quantum only applies to rr. rl uses the
+pretrained --q-table when given, otherwise it trains on each workload first
+(--episodes, seeded by --seed). --cores above 1 runs the multi-core simulator.
+
+Each pool task is one workload with all of its runs, so a file is read once.
+Rows hold the workload, algorithm, quantum, cores, wall time and the summary
+from metrics.schedule_metrics, flattened (waiting_mean, waiting_p99, ...).
+They are written to --out as CSV or JSON (by extension) in workload order, or
+printed when --out is not given. Plotting and pandas are only imported when
+--plot or a CSV workload needs them.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from loader import load_columns
+from metrics import TIMES, schedule_metrics
+from process import ProcessTable
+from runner import find_workloads, run_once
+from scheduler.multicore import ALGORITHMS
+
+SUMMARY = ("count", "makespan", "throughput", "utilization", "idle_time")
+
+
+def run_configs(algorithms, quanta, cores):
+    """(algorithm, quantum, cores) per run; quantum is None except for rr."""
+    configs = []
+    for algorithm in algorithms:
+        for quantum in (quanta if algorithm == "rr" else [None]):
+            for n_cores in cores:
+                configs.append((algorithm, quantum, n_cores))
+    return configs
+
+
+def metrics_row(metrics):
+    row = {name: metrics.get(name) for name in SUMMARY}
+    for name in TIMES:
+        for stat, value in metrics[name].items():
+            row[f"{name}_{stat}"] = value
+    return row
+
+
+def run_workload(path, configs, q_table_path=None, episodes=1000, seed=0):
+    """
+    Pool task: every run of one workload. Returns one row per config, in order,
+    or a single row with an error message if the workload cannot be read, so one
+    bad trace does not abort a whole sweep.
+    """
+    try:
+        columns = load_columns(path)
+    except (OSError, ValueError) as e:
+        return [{"workload": path, "error": f"{type(e).__name__}: {e}"}]
+    rows = []
+    for algorithm, quantum, cores in configs:
+        table = ProcessTable.from_columns(columns)
+        started = time.perf_counter()
+        processes, gantt = run_once(table, algorithm, quantum, cores, q_table_path, episodes, seed)
+        elapsed = time.perf_counter() - started
+        row = {"workload": path, "algorithm": algorithm, "quantum": quantum, "cores": cores, "seconds": elapsed}
+        row.update(metrics_row(schedule_metrics(processes, gantt, by_priority=False)))
+        rows.append(row)
+    return rows
+
+
+def run_batch(workloads, configs, workers=None, q_table_path=None, episodes=1000, seed=0, progress=None):
+    """
+    Run configs on every workload across a pool of workers (default: all cores;
+    1 runs in-process). Returns all rows, grouped by workload in input order.
+    progress: optional callback(done_workloads, total_workloads)
+    """
+    total = len(workloads)
+    workers = min(workers or os.cpu_count() or 1, max(total, 1))
+    args = (configs, q_table_path, episodes, seed)
+    rows = []
+    if workers == 1:
+        for done, path in enumerate(workloads, 1):
+            rows.extend(run_workload(path, *args))
+            if progress is not None:
+                progress(done, total)
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map keeps input order; results stream back as earlier workloads finish
+        results = pool.map(run_workload, workloads, *([arg] * total for arg in args))
+        for done, workload_rows in enumerate(results, 1):
+            rows.extend(workload_rows)
+            if progress is not None:
+                progress(done, total)
+    return rows
+
+
+def write_rows(rows, path):
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
         return
+    # Error rows only have a few fields; dict.fromkeys keeps the first-seen column order
+    fields = list(dict.fromkeys(name for row in rows for name in row)) or ["workload"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_rows(rows):
+    for row in rows:
+        if "error" in row:
+            print(f"{row['workload']}: {row['error']}")
+            continue
+        quantum = f" q={row['quantum']}" if row["quantum"] is not None else ""
+        print(f"{row['workload']} {row['algorithm']}{quantum} cores={row['cores']}: "
+              f"avg waiting {row['waiting_mean']:.2f}, p99 {row['waiting_p99']:.2f}, "
+              f"avg turnaround {row['turnaround_mean']:.2f} ({row['seconds']:.3f}s)")
+
+
+def plot(path, algorithm, quantum, cores, q_table_path, episodes, seed):
+    from visualizer import plot_gantt_chart
+
+    columns = load_columns(path)
+    _, gantt = run_once(ProcessTable.from_columns(columns), algorithm, quantum, cores,
+                        q_table_path, episodes, seed)
+    plot_gantt_chart(gantt, title=f"Scheduling Algorithm: {algorithm.upper()} ({os.path.basename(path)})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workloads", nargs="+", help="workload files or directories")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--quantum", nargs="+", type=int, default=[6], help="Round Robin quanta")
+    parser.add_argument("--cores", nargs="+", type=int, default=[1])
+    parser.add_argument("--q-table", help="pretrained binary Q-table for rl")
+    parser.add_argument("--episodes", type=int, default=1000, help="training episodes for rl without --q-table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--out", help="results .csv or .json")
+    parser.add_argument("--plot", action="store_true", help="show the Gantt chart of each run (single workload)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workloads = find_workloads(args.workloads)
+    configs = run_configs(args.algorithms, args.quantum, args.cores)
+    if args.plot and len(workloads) != 1:
+        raise ValueError("--plot needs exactly one workload")
+
+    started = time.perf_counter()
+    progress = None
+    if args.out:
+        progress = lambda done, total: print(f"\r{done}/{total} workloads", end="", file=sys.stderr, flush=True)
+    rows = run_batch(workloads, configs, args.workers, args.q_table, args.episodes, args.seed, progress)
+    if args.out:
+        print(file=sys.stderr)
+        write_rows(rows, args.out)
+        print(f"Wrote {len(rows)} rows for {len(workloads)} workloads to {args.out} "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        print_rows(rows)
 
-    print_process_metrics(scheduled)
-    plot_gantt_chart(gantt, title=f"Scheduling Algorithm: {['FCFS', 'SJF', 'RR', 'Priority', 'RL'][choice-1]}")
+    if args.plot:
+        for algorithm, quantum, cores in configs:
+            plot(workloads[0], algorithm, quantum, cores, args.q_table, args.episodes, args.seed)
 
 
 if __name__ == "__main__":
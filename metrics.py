@@ -0,0 +1,184 @@
+"""
+Vectorized schedule metrics.
+
+Per-process times come from the arrival, burst, start and completion arrays:
+
+    response   = start - arrival
+    waiting    = completion - arrival - burst
+    turnaround = completion - arrival
+    slowdown   = turnaround / burst
+
+Each is summarized as mean, p50, p95, p99 and max, overall and per priority.
+When Gantt data is given, CPU utilization and idle time are reported too:
+every process runs for exactly its burst, so busy time is the burst total and
+the gantt only supplies the number of cores.
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+from process import ProcessTable
+from scheduler.round_robin import Cycle
+
+PERCENTILES = (50, 95, 99)
+TIMES = ("response", "waiting", "turnaround", "slowdown")
+
+
+def schedule_columns(processes):
+    """arrival, burst, priority, start, completion arrays of a scheduled workload."""
+    if isinstance(processes, ProcessTable):
+        return {name: getattr(processes, name) for name in ("arrival", "burst", "priority", "start", "completion")}
+    if isinstance(processes, dict):
+        return {name: np.asarray(processes[name]) for name in ("arrival", "burst", "priority", "start", "completion")}
+    n = len(processes)
+    return {
+        name: np.fromiter((getattr(p, name) for p in processes), dtype=np.int64, count=n)
+        for name in ("arrival", "burst", "priority", "start", "completion")
+    }
+
+
+def process_times(columns):
+    """Per-process response, waiting, turnaround and slowdown arrays."""
+    turnaround = columns["completion"] - columns["arrival"]
+    return {
+        "response": columns["start"] - columns["arrival"],
+        "waiting": turnaround - columns["burst"],
+        "turnaround": turnaround,
+        "slowdown": turnaround / np.maximum(columns["burst"], 1),
+    }
+
+
+def cpu_time(gantt):
+    """(busy time, number of cores) of a gantt list; Round Robin Cycle runs are counted without expanding."""
+    plain = [entry for entry in gantt if type(entry) is not Cycle]
+    busy = 0
+    if len(plain) < len(gantt):
+        busy += sum(len(entry.pids) * entry.quantum * entry.repeat for entry in gantt if type(entry) is Cycle)
+    count = len(plain)
+    busy += int(np.fromiter(map(itemgetter(2), plain), dtype=np.int64, count=count).sum()
+                - np.fromiter(map(itemgetter(1), plain), dtype=np.int64, count=count).sum())
+    return busy, gantt_cores(gantt)
+
+
+def gantt_cores(gantt):
+    """
+    Number of cores a gantt list uses. Multi-core gantts hold (pid, start, end,
+    core) entries throughout, so only those are scanned for distinct cores.
+    """
+    first = gantt[0] if len(gantt) else None
+    if first is None or type(first) is Cycle or len(first) < 4:
+        return 1
+    cores = np.fromiter(map(itemgetter(3), gantt), dtype=np.int64, count=len(gantt))
+    return len(np.unique(cores))
+
+
+MAX_CELLS = 1 << 22
+
+
+def _summary(values, percentiles, scratch=False):
+    """mean, percentiles and max of values; zeros when there are none. scratch: values may be reordered."""
+    if not len(values):
+        return dict(mean=0.0, **{f"p{q}": 0.0 for q in percentiles}, max=0.0)
+    # One partition serves every percentile and the max
+    points = np.percentile(values, list(percentiles) + [100], overwrite_input=scratch)
+    summary = {"mean": float(values.mean())}
+    summary.update((f"p{q}", float(point)) for q, point in zip(percentiles, points))
+    summary["max"] = float(points[-1])
+    return summary
+
+
+def _group_order(group, n_groups):
+    """(positions sorted by group, values per group) for a group index in range(n_groups) per value."""
+    sizes = np.bincount(group, minlength=n_groups)
+    if len(sizes) > n_groups:
+        raise ValueError(f"Group ids must be below n_groups={n_groups}")
+    # Small group ids take numpy's radix sort
+    order = np.argsort(group.astype(np.int16) if n_groups <= np.iinfo(np.int16).max else group, kind="stable")
+    return order, sizes
+
+
+def _grouped_summaries(values, order, sizes, percentiles):
+    ordered = values[order]
+    bounds = np.r_[0, np.cumsum(sizes)]
+    groups = [_summary(ordered[bounds[g]:bounds[g + 1]], percentiles, scratch=True) for g in range(len(sizes))]
+    # Each group was only reordered within its slice, so ordered still holds every value
+    return _summary(ordered, percentiles, scratch=True), groups
+
+
+def summarize(values, group=None, n_groups=1, percentiles=PERCENTILES):
+    """
+    mean, percentiles (linear interpolation, as np.percentile) and max of
+    values. With group (a group index in range(n_groups) per value) returns
+    (overall, [per group]); groups without values, like empty values,
+    summarize as zeros. Otherwise just the overall dict.
+    """
+    if group is None:
+        return _summary(values, percentiles)
+    order, sizes = _group_order(group, n_groups)
+    return _grouped_summaries(values, order, sizes, percentiles)
+
+
+def _group_index(keys):
+    """(sorted distinct keys, index of each row's key), like np.unique(..., return_inverse=True)."""
+    lo, hi = int(keys.min()), int(keys.max())
+    if hi - lo > MAX_CELLS:
+        distinct, group = np.unique(keys, return_inverse=True)
+        return distinct, group.ravel()
+    # Small key range: counting instead of sorting
+    present = np.bincount(keys - lo) > 0
+    remap = np.cumsum(present) - 1
+    return np.flatnonzero(present) + lo, remap[keys - lo]
+
+
+def schedule_metrics(processes, gantt=None, percentiles=PERCENTILES, by_priority=True):
+    """
+    processes: scheduled Process list, ProcessTable or column dict (see schedule_columns)
+    gantt: optional gantt list of the same schedule, for CPU utilization and idle time
+
+    Returns a dict with count, makespan, throughput, a summary per time in TIMES,
+    and when requested utilization, idle_time and per_priority summaries.
+    """
+    columns = schedule_columns(processes)
+    times = process_times(columns)
+    n = len(columns["arrival"])
+    makespan = int(columns["completion"].max() - columns["arrival"].min()) if n else 0
+
+    metrics = {
+        "count": n,
+        "makespan": makespan,
+        "throughput": n / makespan if makespan else 0.0,
+    }
+    # The time arrays are fresh, so summaries may partition them in place
+    if by_priority and n:
+        priorities, group = _group_index(columns["priority"])
+        order, sizes = _group_order(group, len(priorities))
+        per_priority = {int(priority): {"count": int(size)} for priority, size in zip(priorities, sizes)}
+        for name in TIMES:
+            metrics[name], groups = _grouped_summaries(times[name], order, sizes, percentiles)
+            for priority, summary in zip(per_priority, groups):
+                per_priority[priority][name] = summary
+    else:
+        for name in TIMES:
+            metrics[name] = _summary(times[name], percentiles, scratch=True)
+
+    if gantt is not None:
+        # Every process runs for exactly its burst, so only the core count needs the gantt
+        busy = int(columns["burst"].sum())
+        cores = gantt_cores(gantt)
+        capacity = makespan * cores
+        metrics["cores"] = cores
+        metrics["busy_time"] = int(busy)
+        metrics["idle_time"] = int(capacity - busy)
+        metrics["utilization"] = busy / capacity if capacity else 0.0
+
+    if by_priority and n:
+        metrics["per_priority"] = per_priority
+    return metrics
+
+
+def averages(processes):
+    """(average turnaround, average waiting) as returned by utils.calculate_metrics."""
+    columns = schedule_columns(processes)
+    times = process_times(columns)
+    return float(times["turnaround"].mean()), float(times["waiting"].mean())
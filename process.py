@@ -1,4 +1,9 @@
+import numpy as np
+
+
 class Process:
+    __slots__ = ("pid", "arrival", "burst", "remaining", "priority", "start", "completion")
+
     def __init__(self, pid, arrival, burst, priority=0):
         self.pid = pid
         self.arrival = arrival
@@ -17,3 +22,75 @@ class Process:
 
     def __repr__(self):
         return f"P{self.pid}(AT={self.arrival}, BT={self.burst}, PR={self.priority})"
+
+
+class ProcessTable:
+    """
+    Struct-of-arrays alternative to a list of Process objects.
+
+    Every field is a contiguous int64 array indexed by row. start and completion
+    hold NOT_SET (-1) until a scheduler fills them. Schedulers never reorder the
+    rows; they only write remaining, start and completion.
+    """
+
+    NOT_SET = -1
+    FIELDS = ("pid", "arrival", "burst", "remaining", "priority", "start", "completion")
+
+    def __init__(self, pid, arrival, burst, priority=None):
+        self.pid = np.array(pid, dtype=np.int64)
+        self.arrival = np.array(arrival, dtype=np.int64)
+        self.burst = np.array(burst, dtype=np.int64)
+        n = len(self.pid)
+        self.priority = np.zeros(n, dtype=np.int64) if priority is None else np.array(priority, dtype=np.int64)
+        self.remaining = self.burst.copy()
+        self.start = np.full(n, self.NOT_SET, dtype=np.int64)
+        self.completion = np.full(n, self.NOT_SET, dtype=np.int64)
+
+    @classmethod
+    def from_processes(cls, processes):
+        n = len(processes)
+        table = cls(
+            np.fromiter((p.pid for p in processes), dtype=np.int64, count=n),
+            np.fromiter((p.arrival for p in processes), dtype=np.int64, count=n),
+            np.fromiter((p.burst for p in processes), dtype=np.int64, count=n),
+            np.fromiter((p.priority for p in processes), dtype=np.int64, count=n),
+        )
+        return table
+
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(columns["pid"], columns["arrival"], columns["burst"], columns.get("priority"))
+
+    def __len__(self):
+        return len(self.pid)
+
+    def reset(self):
+        """Clear scheduling results in place."""
+        np.copyto(self.remaining, self.burst)
+        self.start.fill(self.NOT_SET)
+        self.completion.fill(self.NOT_SET)
+
+    def snapshot(self):
+        """Independent copy of every array (the table equivalent of copying each Process)."""
+        table = ProcessTable.__new__(ProcessTable)
+        for name in self.FIELDS:
+            setattr(table, name, getattr(self, name).copy())
+        return table
+
+    def order_by(self, *fields):
+        """Row indexes stably sorted by the given fields, first field most significant."""
+        return np.lexsort(tuple(getattr(self, name) for name in reversed(fields)))
+
+    def to_processes(self):
+        processes = []
+        for row in zip(*(getattr(self, name).tolist() for name in self.FIELDS)):
+            pid, arrival, burst, remaining, priority, start, completion = row
+            p = Process(pid, arrival, burst, priority)
+            p.remaining = remaining
+            p.start = None if start == self.NOT_SET else start
+            p.completion = None if completion == self.NOT_SET else completion
+            processes.append(p)
+        return processes
+
+    def __repr__(self):
+        return f"ProcessTable(n={len(self)})"
@@ -0,0 +1,67 @@
+"""
+Single scheduling runs shared by the batch runner (main.py) and the parameter
+sweeps (sweep.py): workload discovery and one algorithm on one ProcessTable.
+"""
+
+import os
+
+from loader import WORKLOAD_EXTENSIONS
+from scheduler.multicore import ALGORITHMS
+
+_q_tables = {}  # per worker process: q_table path -> loaded table
+
+
+def find_workloads(paths):
+    """Files given directly, plus the workload files in any directories, sorted per directory."""
+    workloads = []
+    for path in paths:
+        if os.path.isdir(path):
+            workloads.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                    if name.lower().endswith(WORKLOAD_EXTENSIONS)))
+        elif os.path.exists(path):
+            workloads.append(path)
+        else:
+            raise ValueError(f"Workload {path} does not exist")
+    return workloads
+
+
+def _rl_scheduler(table, q_table_path, episodes, seed):
+    import random
+
+    from scheduler.q_table_format import load_q_table
+    from scheduler.rl_scheduler import RLScheduler
+
+    rl = RLScheduler(table, episodes=episodes)
+    if q_table_path is None:
+        random.seed(seed)
+        rl.train()
+    else:
+        if q_table_path not in _q_tables:
+            _q_tables[q_table_path] = load_q_table(q_table_path)
+        rl.q_table = _q_tables[q_table_path]
+    return rl
+
+
+def run_once(table, algorithm, quantum=6, cores=1, q_table_path=None, episodes=1000, seed=0):
+    """Schedule a ProcessTable; returns (processes, gantt)."""
+    if cores > 1:
+        from scheduler.multicore import multicore_schedule
+
+        rl = _rl_scheduler(table, q_table_path, episodes, seed) if algorithm == "rl" else None
+        return multicore_schedule(table, algorithm, cores=cores, quantum=quantum or 6, rl=rl)
+    if algorithm == "fcfs":
+        from scheduler.fcfs import fcfs
+        return fcfs(table)
+    if algorithm == "sjf":
+        from scheduler.sjf import sjf
+        return sjf(table)
+    if algorithm == "priority":
+        from scheduler.priority import priority_scheduling
+        return priority_scheduling(table)
+    if algorithm == "rr":
+        from scheduler.round_robin import round_robin
+        # Cycle-compressed gantt: metrics never need the expanded slices
+        return round_robin(table, quantum=quantum, compress=True)
+    if algorithm == "rl":
+        return _rl_scheduler(table, q_table_path, episodes, seed).schedule()
+    raise ValueError(f"Unsupported algorithm {algorithm!r}; expected one of {ALGORITHMS}")
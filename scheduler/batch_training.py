@@ -0,0 +1,181 @@
+"""
+Lockstep batched Q-learning for RLScheduler.
+
+B independent episodes over the same workload advance together as (B, n)
+arrays. Every decision completes one process, so all episodes take exactly n
+steps. Per step, state featurization, epsilon-greedy selection, rewards and TD
+targets are vectorized; only interning state tuples into the QTable remains a
+Python loop over the batch.
+
+Update order: TD targets are computed from the table as it stood at the start
+of the step, then updates to the same (state, action) are applied in episode
+order, exactly as if they had been applied one after another.
+"""
+
+import math
+
+import numpy as np
+
+from scheduler.convergence import ConvergenceMonitor, as_schedule
+from scheduler.rl_env import step_reward
+
+IDLE_STATE = ("idle",)
+
+
+def _features(ready, time, burst, priority):
+    """
+    Vectorized RLScheduler.get_state over a batch; returns (B, 8) int64 and ready counts.
+    burst and priority are int32 columns, which halves the memory traffic of the masked reductions.
+    """
+    count = ready.sum(axis=1)
+    safe = np.maximum(count, 1)
+    big = np.iinfo(np.int32).max
+
+    # Sums as float64 matrix products: exact for integer totals below 2**53
+    mask = ready.astype(np.float64)
+    burst_sum = mask @ burst.astype(np.float64)
+    priority_sum = mask @ priority.astype(np.float64)
+
+    features = np.empty((len(time), 8), dtype=np.int64)
+    features[:, 0] = time // 10
+    features[:, 1] = count
+    # astype truncates toward zero, matching int(sum / n) in get_state
+    features[:, 2] = (burst_sum / safe).astype(np.int64)
+    features[:, 3] = np.where(ready, burst, big).min(axis=1)
+    features[:, 4] = np.where(ready, burst, -big).max(axis=1)
+    features[:, 5] = (priority_sum / safe).astype(np.int64)
+    features[:, 6] = np.where(ready, priority, big).min(axis=1)
+    features[:, 7] = np.where(ready, priority, -big).max(axis=1)
+    return features, count
+
+
+def _intern(q_table, features, count):
+    states = list(map(tuple, features.tolist()))
+    get = q_table.index.get
+    rows = [get(state, -1) for state in states]
+    # Only states missing from the table (or idle) need the slow path
+    for i, row in enumerate(rows):
+        if row < 0 or not count[i]:
+            c = int(count[i])
+            rows[i] = q_table.intern(states[i], c) if c else q_table.intern(IDLE_STATE, 1)
+    return np.array(rows, dtype=np.int64)
+
+
+def _ordered_td_update(q_table, rows, actions, targets, alpha):
+    width = q_table.values.shape[1]
+    keys = rows * width + actions
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    targets = targets[order]
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    position = np.arange(len(keys)) - np.repeat(starts, sizes)  # 0-based within each group
+    remaining = np.repeat(sizes, sizes) - position - 1
+
+    # Applying q += alpha * (t_k - q) for k = 1..m in order gives
+    # (1 - alpha)^m * q0 + sum_k alpha * (1 - alpha)^(m - k) * t_k
+    decay = 1.0 - alpha
+    contributions = np.add.reduceat(alpha * decay ** remaining * targets, starts)
+
+    unique_rows = keys[starts] // width
+    unique_actions = keys[starts] % width
+    q0 = q_table.values[unique_rows, unique_actions].astype(np.float64)
+    q1 = decay ** sizes * q0 + contributions
+    q_table.values[unique_rows, unique_actions] = q1
+    q_table.visits[unique_rows, unique_actions] += sizes.astype(np.int32)
+    q_table.clock += 1
+    q_table.last_used[unique_rows] = q_table.clock
+    return float(np.abs(q1 - q0).max()) if len(q1) else 0.0
+
+
+def train_batched(rl, batch_size=256, log_rewards=None, reward_mode="waiting", seed=None, epsilon_schedule=None,
+                  alpha_schedule=None, convergence=None):
+    """
+    Run up to rl.episodes episodes of Q-learning, batch_size at a time, into rl.q_table.
+    Uses rl.alpha, rl.gamma and rl.epsilon; exploration draws come from a NumPy
+    Generator seeded with seed. Schedules are evaluated at the first episode of
+    each batch, and the convergence monitor is checked after each batch, where
+    every episode of the batch reports the batch's largest Q-value change.
+    Returns a TrainingReport.
+    """
+    if log_rewards is None:
+        log_rewards = []
+    epsilon_at = as_schedule(rl.epsilon if epsilon_schedule is None else epsilon_schedule)
+    alpha_at = as_schedule(rl.alpha if alpha_schedule is None else alpha_schedule)
+    monitor = convergence if convergence is not None else ConvergenceMonitor(min_episodes=math.inf)
+    q_table = rl._writable_q_table()
+    rl.q_table = q_table
+
+    env = rl.env
+    n = env.n
+    arrival = env.arrival
+    burst = env.burst
+    priority = env.priority
+    burst32 = burst.astype(np.int32)
+    priority32 = priority.astype(np.int32)
+    rng = np.random.default_rng(seed)
+    never = np.iinfo(np.int64).max
+
+    episodes = 0
+    monitor.start()
+    converged = False
+    while episodes < rl.episodes and not converged:
+        b = min(batch_size, rl.episodes - episodes)
+        epsilon = epsilon_at(episodes)
+        alpha = alpha_at(episodes)
+        max_delta = 0.0
+        done = np.zeros((b, n), dtype=bool)
+        time = np.zeros(b, dtype=np.int64)
+        total_reward = np.zeros(b, dtype=np.int64)
+        batch = np.arange(b)
+
+        ready = np.zeros((b, n), dtype=bool)
+        rows = np.zeros(b, dtype=np.int64)
+        stale = np.ones(b, dtype=bool)  # episodes whose state must be recomputed
+
+        for _ in range(n):
+            # Jump idle episodes to their next arrival
+            idle = stale | ~ready.any(axis=1)
+            if idle.any():
+                pending = ~done[idle]
+                next_arrival = np.where(pending, arrival, never).min(axis=1)
+                time[idle] = np.maximum(time[idle], next_arrival)
+                ready[idle] = pending & (arrival <= time[idle, None])
+                features, count = _features(ready[idle], time[idle], burst32, priority32)
+                rows[idle] = _intern(q_table, features, count)
+            count = ready.sum(axis=1)
+
+            explore = rng.random(b) < epsilon
+            random_actions = (rng.random(b) * count).astype(np.int64)
+            actions = np.where(explore, random_actions, q_table.best_actions(rows))
+
+            # The action-th ready process, with ready processes in ascending index order
+            chosen = (np.cumsum(ready, axis=1) == (actions + 1)[:, None]).argmax(axis=1)
+
+            waiting_time = time - arrival[chosen]
+            turnaround_time = waiting_time + burst[chosen]
+            reward = step_reward(reward_mode, waiting_time, turnaround_time)
+            total_reward += reward
+
+            time += burst[chosen]
+            done[batch, chosen] = True
+
+            ready = ~done & (arrival <= time[:, None])
+            next_features, next_count = _features(ready, time, burst32, priority32)
+            next_rows = _intern(q_table, next_features, next_count)
+            q_next_max = np.where(next_count > 0, q_table.best_values(next_rows), 0.0)
+
+            delta = _ordered_td_update(q_table, rows, actions, reward + rl.gamma * q_next_max, alpha)
+            max_delta = max(max_delta, delta)
+            # The post-step state is the next decision state unless the episode goes idle
+            rows = next_rows
+            stale[:] = False
+
+        log_rewards.extend(total_reward.tolist())
+        episodes += b
+        rl.enforce_memory_cap()
+        for episode_reward in total_reward.tolist():
+            converged = monitor.update(episode_reward, max_delta)
+
+    return monitor.report(episodes)
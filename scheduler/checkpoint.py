@@ -0,0 +1,301 @@
+"""
+Checkpoints of RLScheduler training: the Q-table, episode counter, epsilon,
+the `random` module state and the convergence monitor's progress, so train()
+can resume after a crash or restart.
+
+A checkpoint directory holds
+
+    snapshot.npz       the whole table plus its training state, as of some log segment
+    deltas.<n>.log     append-only records of the rows changed since the previous record
+
+Saving only appends the rows added or whose last_used clock moved since the
+previous save, so its cost follows the number of states touched, not the
+table size.
+Each record is framed with its length and a CRC32; a record torn by a crash
+fails the check and it and everything after it is ignored.
+
+When the log grows past compact_bytes it is rotated to a new segment, and a
+background thread folds the snapshot and the closed segments into a new
+snapshot, written to a temporary file and renamed into place, then deletes the
+folded segments. Training keeps appending to the new segment meanwhile.
+Evictions and merges renumber or drop rows, which a delta cannot express, so
+after one the next save writes a full snapshot instead.
+"""
+
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from scheduler.q_table import QTable
+from scheduler.q_table_format import KEY_WIDTH, decode_state, encode_state
+
+TrainingState = namedtuple("TrainingState", "q_table episode epsilon rng_state rewards monitor",
+                           defaults=(None,))
+
+SNAPSHOT = "snapshot.npz"
+_FRAME = struct.Struct("<QI")  # payload length, crc32
+_ARRAYS = ("keys", "widths", "values", "visits", "last_used")
+
+
+def _encode_keys(states):
+    keys = np.zeros((len(states), KEY_WIDTH), dtype=np.int32)
+    for i, state in enumerate(states):
+        row = encode_state(state)
+        if row is None:
+            raise ValueError(f"State {state!r} does not fit the Q-table key schema and cannot be checkpointed")
+        keys[i] = row
+    return keys
+
+
+def _cells(rows, widths):
+    """Row and column indices of the first widths[i] cells of each row, row by row."""
+    starts = np.cumsum(widths) - widths
+    return np.repeat(rows, widths), np.arange(int(widths.sum())) - np.repeat(starts, widths)
+
+
+def _rows(q_table, rows):
+    """Arrays of the given rows of a QTable; values and visits are flattened to each row's width."""
+    rows = np.asarray(rows, dtype=np.int64)
+    widths = q_table.widths[rows].astype(np.int64)
+    cells = _cells(rows, widths)
+    return {
+        "keys": _encode_keys([q_table.states[i] for i in rows.tolist()]),
+        "widths": widths,
+        "values": q_table.values[cells],
+        "visits": q_table.visits[cells],
+        "last_used": q_table.last_used[rows],
+    }
+
+
+def _apply(q_table, arrays):
+    """Insert or overwrite rows of q_table from _rows() arrays."""
+    widths = arrays["widths"]
+    rows = np.fromiter((q_table.intern(decode_state(key), w) for key, w in zip(arrays["keys"].tolist(),
+                                                                              widths.tolist())),
+                       dtype=np.int64, count=len(widths))
+    if len(widths) and widths.max() > q_table.values.shape[1]:
+        q_table._grow(len(q_table.states), int(widths.max()))
+    q_table.widths[rows] = widths
+    cells = _cells(rows, widths)
+    q_table.values[cells] = arrays["values"]
+    q_table.visits[cells] = arrays["visits"]
+    q_table.last_used[rows] = arrays["last_used"]
+
+
+def _pack(arrays, meta):
+    buffer = io.BytesIO()
+    np.savez(buffer, meta=np.array(json.dumps(meta)), **arrays)
+    payload = buffer.getvalue()
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _unpack(payload):
+    with np.load(io.BytesIO(payload)) as data:
+        return {name: data[name] for name in _ARRAYS}, json.loads(str(data["meta"]))
+
+
+def _read_records(path):
+    """(arrays, meta) of every intact record of a log segment, stopping at the first torn one."""
+    with open(path, "rb") as f:
+        while True:
+            frame = f.read(_FRAME.size)
+            if len(frame) < _FRAME.size:
+                return
+            length, crc = _FRAME.unpack(frame)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            yield _unpack(payload)
+
+
+def _meta_state(meta):
+    rng = meta.get("rng_state")
+    rng_state = None if rng is None else (rng[0], tuple(rng[1]), rng[2])
+    return meta["episode"], meta["epsilon"], rng_state, meta.get("monitor")
+
+
+class TrainingCheckpoint:
+    """
+    directory: where snapshot and log segments live (created if missing)
+    every: save every this many episodes
+    compact_bytes: rotate and compact once the current log segment reaches this size
+    """
+
+    def __init__(self, directory, every=50, compact_bytes=64 * 2 ** 20):
+        self.directory = directory
+        self.every = every
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Always a fresh segment: the last one may end in a record torn by a crash
+        self.segment = max(self._segments() + [self._snapshot_segment()]) + 1
+        self.saved_clock = None
+        self.saved_generation = None
+        self.saved_rows = 0
+        self.rewards = []  # every episode reward, restored and new
+        self._unsaved_rewards = []
+        self._compactor = None
+
+    # files
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"deltas.{segment:06d}.log")
+
+    def _segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith("deltas.") and name.endswith(".log"):
+                segments.append(int(name[len("deltas."):-len(".log")]))
+        return sorted(segments)
+
+    def _snapshot_segment(self):
+        path = os.path.join(self.directory, SNAPSHOT)
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as data:
+            return json.loads(str(data["meta"]))["segment"]
+
+    def _read_snapshot(self):
+        path = os.path.join(self.directory, SNAPSHOT)
+        if not os.path.exists(path):
+            return None, None
+        with np.load(path) as data:
+            return {name: data[name] for name in _ARRAYS}, json.loads(str(data["meta"]))
+
+    def _write_snapshot(self, arrays, meta):
+        path = os.path.join(self.directory, SNAPSHOT)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+
+    # restore
+
+    def _replay(self, upto=None):
+        """(QTable, latest meta, rewards logged) from the snapshot and the log segments after it."""
+        arrays, meta = self._read_snapshot()
+        table = QTable()
+        rewards = []
+        first = 1
+        if arrays is not None:
+            _apply(table, arrays)
+            table.clock = meta["clock"]
+            rewards.extend(meta.get("rewards", []))
+            first = meta["segment"] + 1
+        for segment in self._segments():
+            if segment < first or (upto is not None and segment > upto):
+                continue
+            for arrays, record_meta in _read_records(self._segment_path(segment)):
+                _apply(table, arrays)
+                table.clock = record_meta["clock"]
+                rewards.extend(record_meta.get("rewards", []))
+                meta = record_meta
+        return table, meta, rewards
+
+    def restore(self):
+        """The latest TrainingState, or None if nothing has been saved."""
+        self.wait()
+        table, meta, rewards = self._replay()
+        if meta is None:
+            return None
+        episode, epsilon, rng_state, monitor = _meta_state(meta)
+        return TrainingState(table, episode, epsilon, rng_state, rewards, monitor)
+
+    # save
+
+    def begin(self, q_table, state=None):
+        """
+        Start tracking changes of q_table. With the TrainingState it was restored
+        from, later saves are deltas against it; otherwise the first save is a
+        full snapshot replacing whatever the directory held.
+        """
+        if state is not None and state.q_table is q_table:
+            self.saved_clock = int(q_table.clock)
+            self.saved_generation = q_table.generation
+            self.saved_rows = len(q_table)
+            self.rewards = list(state.rewards)
+        else:
+            self.saved_clock = None
+            self.saved_generation = None
+            self.rewards = []
+        self._unsaved_rewards = []
+
+    def record_reward(self, reward):
+        self.rewards.append(reward)
+        self._unsaved_rewards.append(reward)
+
+    def due(self, episode):
+        return self.every and episode % self.every == 0
+
+    def save(self, q_table, episode, epsilon, rng_state, monitor=None):
+        """
+        Persist q_table and the training state after `episode` episodes;
+        monitor is ConvergenceMonitor.state() at that point.
+        """
+        meta = {
+            "episode": episode,
+            "epsilon": epsilon,
+            "rng_state": None if rng_state is None else [rng_state[0], list(rng_state[1]), rng_state[2]],
+            "clock": int(q_table.clock),
+            "rewards": self._unsaved_rewards,
+            "monitor": monitor,
+        }
+        n = len(q_table)
+        if self.saved_clock is None or q_table.generation != self.saved_generation:
+            self._full_snapshot(q_table, meta)
+        else:
+            # New rows are stamped with the clock at which they were interned, which may
+            # equal saved_clock; rows are only appended between generations, so take them by index
+            changed = np.flatnonzero(q_table.last_used[:n] > self.saved_clock)
+            changed = np.union1d(changed, np.arange(self.saved_rows, n))
+            with open(self._segment_path(self.segment), "ab") as f:
+                f.write(_pack(_rows(q_table, changed), meta))
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.getsize(self._segment_path(self.segment)) >= self.compact_bytes:
+                self._start_compaction()
+        self.saved_clock = int(q_table.clock)
+        self.saved_generation = q_table.generation
+        self.saved_rows = n
+        self._unsaved_rewards = []
+
+    def _full_snapshot(self, q_table, meta):
+        self.wait()
+        # Everything logged so far is superseded: the snapshot covers up to the current segment
+        meta = dict(meta, rewards=self.rewards, segment=self.segment)
+        self._write_snapshot(_rows(q_table, np.arange(len(q_table))), meta)
+        for segment in self._segments():
+            if segment <= self.segment:
+                os.remove(self._segment_path(segment))
+        self.segment += 1
+
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        upto = self.segment
+        self.segment += 1
+        self._compactor = threading.Thread(target=self._compact, args=(upto,), daemon=True)
+        self._compactor.start()
+
+    def _compact(self, upto):
+        """Fold the snapshot and segments up to `upto` into a new snapshot; runs off the training thread."""
+        table, meta, rewards = self._replay(upto)
+        if meta is None:
+            return
+        self._write_snapshot(_rows(table, np.arange(len(table))), dict(meta, rewards=rewards, segment=upto))
+        for segment in self._segments():
+            if segment <= upto:
+                os.remove(self._segment_path(segment))
+
+    def wait(self):
+        """Block until a running background compaction has finished."""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self):
+        self.wait()
@@ -0,0 +1,171 @@
+"""
+Decay schedules and convergence detection for RLScheduler training.
+
+A schedule maps the episode number to a value (epsilon or alpha); plain
+numbers are constant schedules. ConvergenceMonitor watches per-episode total
+reward and largest Q-value change and reports convergence once either has
+plateaued: the mean of the latest `window` episodes is within `tolerance`
+(relative) of the mean of the window before it, `patience` episodes in a row.
+"""
+
+import math
+import time
+from collections import deque, namedtuple
+
+TrainingReport = namedtuple("TrainingReport", "episodes converged_at elapsed episodes_per_second time_to_converge")
+
+
+class ExponentialDecay:
+    """start * rate ** episode, never below minimum."""
+
+    def __init__(self, start, rate=0.995, minimum=0.01):
+        self.start = start
+        self.rate = rate
+        self.minimum = minimum
+
+    def __call__(self, episode):
+        return max(self.start * self.rate ** episode, self.minimum)
+
+
+class LinearDecay:
+    """From start to end over `episodes` episodes, then end."""
+
+    def __init__(self, start, end, episodes):
+        self.start = start
+        self.end = end
+        self.episodes = episodes
+
+    def __call__(self, episode):
+        fraction = min(episode / self.episodes, 1.0) if self.episodes else 1.0
+        return self.start + (self.end - self.start) * fraction
+
+
+class InverseTimeDecay:
+    """start / (1 + decay * episode), the classic stochastic-approximation step size."""
+
+    def __init__(self, start, decay=0.01):
+        self.start = start
+        self.decay = decay
+
+    def __call__(self, episode):
+        return self.start / (1 + self.decay * episode)
+
+
+def as_schedule(value):
+    if callable(value):
+        return value
+    return lambda episode: value
+
+
+class _Plateau:
+    """Running means of the latest two windows of a series."""
+
+    def __init__(self, window):
+        self.values = deque(maxlen=2 * window)
+        self.window = window
+        self.recent = 0.0
+        self.previous = 0.0
+
+    def add(self, value):
+        if len(self.values) == self.values.maxlen:
+            self.previous -= self.values[0]
+        if len(self.values) >= self.window:
+            moved = self.values[-self.window]
+            self.recent -= moved
+            self.previous += moved
+        self.values.append(value)
+        self.recent += value
+
+    def state(self):
+        return [[float(value) for value in self.values], float(self.recent), float(self.previous)]
+
+    def load_state(self, state):
+        values, self.recent, self.previous = state
+        self.values.clear()
+        self.values.extend(values)
+
+    def flat(self, tolerance):
+        if len(self.values) < self.values.maxlen:
+            return False
+        recent = self.recent / self.window
+        previous = self.previous / self.window
+        return abs(recent - previous) <= tolerance * max(abs(previous), 1e-12)
+
+
+class ConvergenceMonitor:
+    """
+    The clock starts when training does (see start) or at the first update.
+    elapsed and episodes_per_second in the report cover this run only, while
+    converged_at and time_to_converge also count the training before the
+    checkpoint it resumed from, once load_state() has restored the monitor.
+    """
+
+    def __init__(self, window=50, tolerance=0.01, patience=20, min_episodes=100, use_reward=True,
+                 use_q_delta=True):
+        self.window = window
+        self.tolerance = tolerance
+        self.patience = patience
+        self.min_episodes = min_episodes
+        self.use_reward = use_reward
+        self.use_q_delta = use_q_delta
+        self.rewards = _Plateau(window)
+        self.q_deltas = _Plateau(window)
+        self.streak = 0
+        self.episodes = 0
+        self.converged_at = None
+        self.started = None
+        self.converged_time = None
+        self.resumed_elapsed = 0.0  # training time before the checkpoint this run resumed from
+
+    def start(self):
+        """Start the clock; trainers call this just before their first episode."""
+        self.started = time.perf_counter()
+
+    def _elapsed(self):
+        return 0.0 if self.started is None else time.perf_counter() - self.started
+
+    def update(self, total_reward, max_q_delta=math.nan):
+        """Record one episode; returns True once training has converged."""
+        if self.started is None:
+            self.start()
+        self.episodes += 1
+        self.rewards.add(total_reward)
+        if not math.isnan(max_q_delta):
+            self.q_deltas.add(max_q_delta)
+
+        flat = (self.use_reward and self.rewards.flat(self.tolerance)) or \
+               (self.use_q_delta and self.q_deltas.flat(self.tolerance))
+        self.streak = self.streak + 1 if flat else 0
+        if self.converged_at is None and self.episodes >= self.min_episodes and self.streak >= self.patience:
+            self.converged_at = self.episodes
+            self.converged_time = self.resumed_elapsed + self._elapsed()
+        return self.converged_at is not None
+
+    def report(self, episodes=None):
+        elapsed = self._elapsed()
+        episodes = self.episodes if episodes is None else episodes
+        return TrainingReport(episodes, self.converged_at, elapsed, episodes / elapsed if elapsed else 0.0,
+                              self.converged_time)
+
+    def state(self):
+        """Progress so far as JSON-serialisable data, saved with training checkpoints."""
+        return {
+            "episodes": self.episodes,
+            "streak": self.streak,
+            "converged_at": self.converged_at,
+            "converged_time": self.converged_time,
+            "elapsed": self.resumed_elapsed + self._elapsed(),
+            "rewards": self.rewards.state(),
+            "q_deltas": self.q_deltas.state(),
+        }
+
+    def load_state(self, state):
+        """Continue from state(); the clock restarts at the next start() or update."""
+        self.episodes = state["episodes"]
+        self.streak = state["streak"]
+        self.converged_at = state["converged_at"]
+        self.converged_time = state["converged_time"]
+        self.resumed_elapsed = state["elapsed"]
+        self.started = None
+        self.rewards.load_state(state["rewards"])
+        self.q_deltas.load_state(state["q_deltas"])
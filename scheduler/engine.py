@@ -0,0 +1,73 @@
+import heapq
+from operator import attrgetter
+
+from process import ProcessTable
+
+
+def run_non_preemptive(arrival, burst, key):
+    """
+    Event-driven core shared by the non-preemptive schedulers.
+
+    arrival, burst, key: sequences indexed by position, positions already in
+    arrival order; key gives the ready-queue ordering (smallest runs first)
+
+    Returns the runs as (position, start, completion) in execution order.
+
+    Ties on key are broken by position, which matches a linear min() scan over
+    the arrival-ordered list. When the ready heap is empty the clock jumps
+    straight to the next arrival instead of ticking.
+    """
+    n = len(arrival)
+    ready = []
+    runs = []
+    time = 0
+    i = 0  # position of the next process to arrive
+
+    while i < n or ready:
+        if not ready and arrival[i] > time:
+            # CPU is idle, jump to the next arrival
+            time = arrival[i]
+
+        while i < n and arrival[i] <= time:
+            heapq.heappush(ready, (key[i], i))
+            i += 1
+
+        _, pos = heapq.heappop(ready)
+        start = time
+        time += burst[pos]
+        runs.append((pos, start, time))
+
+    return runs
+
+
+def schedule_non_preemptive(processes, sort_fields, key_field):
+    """
+    Run the engine on a list of Process objects or a ProcessTable and return the Gantt list.
+
+    A list is sorted in place by sort_fields (as the schedulers always did) and
+    its processes get start/completion set. A table keeps its row order; its
+    start, completion and remaining arrays are filled instead.
+    """
+    if isinstance(processes, ProcessTable):
+        order = processes.order_by(*sort_fields)
+        runs = run_non_preemptive(processes.arrival[order].tolist(), processes.burst[order].tolist(),
+                                  getattr(processes, key_field)[order].tolist())
+        if not runs:
+            return []
+        positions, starts, completions = zip(*runs)
+        rows = order[list(positions)]
+        processes.start[rows] = starts
+        processes.completion[rows] = completions
+        processes.remaining[rows] = 0
+        return list(zip(processes.pid[rows].tolist(), starts, completions))
+
+    processes.sort(key=attrgetter(*sort_fields))
+    runs = run_non_preemptive([p.arrival for p in processes], [p.burst for p in processes],
+                              [getattr(p, key_field) for p in processes])
+    gantt = []
+    for pos, start, completion in runs:
+        current = processes[pos]
+        current.start = start
+        current.completion = completion
+        gantt.append((current.pid, start, completion))
+    return gantt
@@ -1,4 +1,27 @@
+import numpy as np
+
+from process import ProcessTable
+
+
+def _fcfs_table(table):
+    # start_i = max(arrival_i, completion_{i-1}) unrolls to a running maximum over prefix sums
+    order = np.argsort(table.arrival, kind="stable")
+    arrival = table.arrival[order]
+    burst = table.burst[order]
+    ends = np.cumsum(burst)
+    slack = np.maximum.accumulate(np.maximum(arrival - (ends - burst), 0)) if len(order) else ends
+    completion = ends + slack
+    start = completion - burst
+    table.start[order] = start
+    table.completion[order] = completion
+    table.remaining[order] = 0
+    return list(zip(table.pid[order].tolist(), start.tolist(), completion.tolist()))
+
+
 def fcfs(processes):
+    if isinstance(processes, ProcessTable):
+        return processes, _fcfs_table(processes)
+
     processes.sort(key=lambda p: p.arrival)
     time = 0
     gantt = []
@@ -11,4 +34,4 @@ def fcfs(processes):
         p.completion = time
         gantt.append((p.pid, p.start, p.completion))
 
-    return processes, gantt
\ No newline at end of file
+    return processes, gantt
@@ -0,0 +1,219 @@
+"""
+Event-driven N-core (SMP) scheduling simulation.
+
+Every algorithm of the single-CPU schedulers is available: "fcfs", "sjf",
+"priority", "rr" (Round Robin) and "rl" (greedy policy of a trained
+RLScheduler). Ready processes wait either in one shared queue
+(policy="global") or in per-core queues (policy="work_stealing"), where
+arrivals are dealt to cores in turn and an idle core whose own queue is empty
+takes the best entry from the longest non-empty queue.
+
+Gantt entries carry the core as a fourth field: (pid, start, end, core).
+With cores=1 the schedules match the single-CPU functions exactly.
+"""
+
+import heapq
+import random
+from bisect import insort
+from collections import deque
+
+import numpy as np
+
+from process import ProcessTable
+from scheduler.ready_stats import ReadyStats
+
+ALGORITHMS = ("fcfs", "sjf", "priority", "rr", "rl")
+POLICIES = ("global", "work_stealing")
+
+# Admission order and heap key field per algorithm, mirroring the single-CPU sorts
+_ORDERING = {
+    "fcfs": (("arrival",), None),
+    "sjf": (("arrival", "burst"), "burst"),
+    "priority": (("arrival", "priority"), "priority"),
+    "rr": (("arrival",), None),
+    "rl": (("arrival",), None),
+}
+
+
+class _KeyQueue:
+    """Min-heap on (key, admission rank)."""
+
+    def __init__(self, key, rank):
+        self.heap = []
+        self.key = key
+        self.rank = rank
+
+    def push(self, row):
+        heapq.heappush(self.heap, (self.key[row], self.rank[row], row))
+
+    def pop(self, time):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class _FifoQueue:
+    def __init__(self):
+        self.queue = deque()
+
+    def push(self, row):
+        self.queue.append(row)
+
+    def pop(self, time):
+        return self.queue.popleft()
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class _RLQueue:
+    """Ready list in row order plus ReadyStats, so decisions match RLScheduler.schedule."""
+
+    def __init__(self, rl, burst, priority):
+        self.rl = rl
+        self.burst = burst
+        self.priority = priority
+        self.ready = []
+        self.stats = ReadyStats()
+
+    def push(self, row):
+        insort(self.ready, row)
+        self.stats.add(self.burst[row], self.priority[row])
+
+    def pop(self, time):
+        q_values = self.rl.q_table.get(self.rl.get_state(time, self.stats))
+        if q_values is None:
+            action_index = random.choice(range(len(self.ready)))
+        else:
+            action_index = int(np.argmax(q_values))
+        row = self.ready.pop(action_index)
+        self.stats.remove(self.burst[row], self.priority[row])
+        return row
+
+    def __len__(self):
+        return len(self.ready)
+
+
+def multicore_schedule(processes, algorithm="fcfs", cores=2, policy="global", quantum=6, rl=None):
+    """
+    Simulate `cores` CPUs. processes is a list of Process objects or a ProcessTable
+    and gets start/completion filled like the single-CPU schedulers.
+    rl: a trained RLScheduler (or anything with q_table and get_state), required for "rl".
+
+    Returns (processes, gantt) with gantt entries (pid, start, end, core).
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm {algorithm!r}; expected one of {ALGORITHMS}")
+    if policy not in POLICIES:
+        raise ValueError(f"Unsupported policy {policy!r}; expected one of {POLICIES}")
+    if cores < 1:
+        raise ValueError("cores must be at least 1")
+    if algorithm == "rl" and rl is None:
+        raise ValueError("The rl algorithm needs a trained RLScheduler")
+
+    table = processes if isinstance(processes, ProcessTable) else ProcessTable.from_processes(processes)
+    n = len(table)
+    pid = table.pid.tolist()
+    arrival = table.arrival.tolist()
+    burst = table.burst.tolist()
+    priority = table.priority.tolist()
+
+    sort_fields, key_field = _ORDERING[algorithm]
+    order = table.order_by(*sort_fields).tolist()
+    rank = [0] * n
+    for r, row in enumerate(order):
+        rank[row] = r
+
+    if algorithm == "rr":
+        make_queue = _FifoQueue
+    elif algorithm == "rl":
+        make_queue = lambda: _RLQueue(rl, burst, priority)
+    else:
+        key = getattr(table, key_field).tolist() if key_field else rank
+        make_queue = lambda: _KeyQueue(key, rank)
+
+    shared = policy == "global"
+    queues = [make_queue()] if shared else [make_queue() for _ in range(cores)]
+    loaded = set()  # cores with a non-empty queue (work stealing only), to avoid scanning all queues
+    preemptive = algorithm == "rr"
+
+    remaining = list(burst)
+    start = [ProcessTable.NOT_SET] * n
+    completion = [ProcessTable.NOT_SET] * n
+    running = []  # heap of (end, core, row)
+    idle = list(range(cores))  # heap of idle core ids, lowest dispatched first
+    gantt = []
+    queued = 0
+    done = 0
+    i = 0  # position in order of the next arrival
+    time = 0
+
+    while done < n:
+        # Next event: a core finishing, or an arrival that an idle core could pick up.
+        # Arrivals while every core is busy are admitted at the next completion.
+        candidates = [running[0][0]] if running else []
+        if i < n and idle:
+            candidates.append(arrival[order[i]])
+        time = max(time, min(candidates))
+
+        # Completions (and quantum expiries) at this instant free their cores
+        preempted = []
+        while running and running[0][0] <= time:
+            _, core, row = heapq.heappop(running)
+            heapq.heappush(idle, core)
+            if remaining[row] > 0:
+                preempted.append((core, row))
+            else:
+                completion[row] = time
+                done += 1
+
+        # New arrivals enter before preempted processes, as in single-CPU Round Robin
+        while i < n and arrival[order[i]] <= time:
+            row = order[i]
+            if shared:
+                queues[0].push(row)
+            else:
+                queues[i % cores].push(row)
+                loaded.add(i % cores)
+            i += 1
+            queued += 1
+        for core, row in preempted:
+            if shared:
+                queues[0].push(row)
+            else:
+                queues[core].push(row)
+                loaded.add(core)
+            queued += 1
+
+        while idle and queued:
+            core = heapq.heappop(idle)
+            if shared:
+                row = queues[0].pop(time)
+            else:
+                if core not in loaded:
+                    # Work stealing: take from the most loaded core
+                    core_queue = max(loaded, key=lambda c: len(queues[c]))
+                else:
+                    core_queue = core
+                row = queues[core_queue].pop(time)
+                if not len(queues[core_queue]):
+                    loaded.discard(core_queue)
+            queued -= 1
+            if start[row] == ProcessTable.NOT_SET:
+                start[row] = time
+            run_time = min(remaining[row], quantum) if preemptive else remaining[row]
+            remaining[row] -= run_time
+            heapq.heappush(running, (time + run_time, core, row))
+            gantt.append((pid[row], time, time + run_time, core))
+
+    if isinstance(processes, ProcessTable):
+        processes.start[:] = start
+        processes.completion[:] = completion
+        processes.remaining.fill(0)
+    else:
+        for p, p_start, p_completion in zip(processes, start, completion):
+            p.remaining = 0
+            p.start = p_start
+            p.completion = p_completion
+    return processes, gantt
@@ -0,0 +1,292 @@
+"""
+Online (incremental) schedulers for live arrival streams.
+
+Instead of taking the whole workload up front, an OnlineScheduler is fed
+arrivals as they happen and is asked what to run whenever the CPU may be free:
+
+    sched = SJFOnline()
+    sched.submit(process)                 # O(log n)
+    decision = sched.next_decision(now)   # Decision(pid, start, end) or None
+    sched.pop_completions()               # finished work since the last call
+
+A decision runs its process on [start, end). Call next_decision again at
+decision.end (after submitting every arrival up to that time): the slice is
+settled first, then the next process is picked. Only the last `history`
+completion records are kept; lifetime totals are kept as running sums, so
+memory is bounded by the ready queue, not by the length of the stream.
+"""
+
+import heapq
+import random
+from collections import deque, namedtuple
+
+import numpy as np
+
+from scheduler.ready_stats import ReadyStats
+
+Decision = namedtuple("Decision", "pid start end")
+Completion = namedtuple("Completion", "pid arrival burst start completion")
+
+
+class OnlineScheduler:
+    preemptive = False
+    quantum = None
+
+    def __init__(self, history=10000):
+        self._seq = 0
+        self.running = None  # (process, start, end) of the slice on the CPU
+        self.completions = deque(maxlen=history)
+        self.completed = 0
+        self.total_turnaround = 0
+        self.total_waiting = 0
+
+    # ready-queue policy, provided by subclasses
+
+    def _push(self, process, seq):
+        raise NotImplementedError
+
+    def _pop(self, now):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def submit(self, process):
+        """Add an arrived process to the ready queue."""
+        process.remaining = process.burst
+        process.start = None
+        process.completion = None
+        self._push(process, self._seq)
+        self._seq += 1
+
+    def advance(self, now):
+        """Settle the running slice if it has ended by now."""
+        if self.running is None or self.running[2] > now:
+            return
+        process, _, end = self.running
+        self.running = None
+        if process.remaining > 0:
+            self._push(process, self._seq)
+            self._seq += 1
+            return
+        process.completion = end
+        turnaround = end - process.arrival
+        self.completed += 1
+        self.total_turnaround += turnaround
+        self.total_waiting += turnaround - process.burst
+        self.completions.append(Completion(process.pid, process.arrival, process.burst, process.start, end))
+
+    def next_decision(self, now):
+        """
+        Pick the process to run at now. Returns None while the CPU is still busy
+        or nothing is ready.
+        """
+        self.advance(now)
+        if self.running is not None or not len(self):
+            return None
+        process = self._pop(now)
+        if process.start is None:
+            process.start = now
+        run_time = min(process.remaining, self.quantum) if self.preemptive else process.remaining
+        process.remaining -= run_time
+        self.running = (process, now, now + run_time)
+        return Decision(process.pid, now, now + run_time)
+
+    @property
+    def busy_until(self):
+        return None if self.running is None else self.running[2]
+
+    def pop_completions(self):
+        completions = list(self.completions)
+        self.completions.clear()
+        return completions
+
+    def metrics(self):
+        if not self.completed:
+            return 0.0, 0.0
+        return self.total_turnaround / self.completed, self.total_waiting / self.completed
+
+
+class _HeapOnline(OnlineScheduler):
+    def __init__(self, history=10000):
+        super().__init__(history)
+        self._ready = []
+
+    def _key(self, process):
+        raise NotImplementedError
+
+    def _push(self, process, seq):
+        heapq.heappush(self._ready, (self._key(process), seq, process))
+
+    def _pop(self, now):
+        return heapq.heappop(self._ready)[2]
+
+    def __len__(self):
+        return len(self._ready)
+
+
+class FCFSOnline(_HeapOnline):
+    def _key(self, process):
+        return process.arrival
+
+
+class SJFOnline(_HeapOnline):
+    def _key(self, process):
+        return process.burst
+
+
+class PriorityOnline(_HeapOnline):
+    def _key(self, process):
+        return process.priority
+
+
+class RoundRobinOnline(OnlineScheduler):
+    preemptive = True
+
+    def __init__(self, quantum=6, history=10000):
+        super().__init__(history)
+        self.quantum = quantum
+        self._ready = deque()
+
+    def _push(self, process, seq):
+        self._ready.append(process)
+
+    def _pop(self, now):
+        return self._ready.popleft()
+
+    def __len__(self):
+        return len(self._ready)
+
+
+class _SlotQueue:
+    """
+    FIFO of processes that can also remove the k-th queued one in O(log n).
+
+    Processes take consecutive slots; a Fenwick tree counts the occupied ones
+    so the k-th can be found by descending the tree. When the slots run out the
+    queue is rebuilt from the occupied slots only, which keeps memory
+    proportional to the queue length and costs amortised O(1) per append.
+    """
+
+    def __init__(self):
+        self._rebuild([])
+
+    def _rebuild(self, processes):
+        capacity = max(16, 2 * len(processes))
+        tree = [0] * (capacity + 1)
+        tree[1:len(processes) + 1] = [1] * len(processes)
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        self._slots = processes + [None] * (capacity - len(processes))
+        self._tree = tree
+        self._next = len(processes)
+        self._count = len(processes)
+        self._step = 1 << (capacity.bit_length() - 1)
+
+    def __len__(self):
+        return self._count
+
+    def append(self, process):
+        if self._next == len(self._slots):
+            self._rebuild([p for p in self._slots if p is not None])
+        self._slots[self._next] = process
+        self._add(self._next + 1, 1)
+        self._next += 1
+        self._count += 1
+
+    def _add(self, i, delta):
+        tree = self._tree
+        capacity = len(tree) - 1
+        while i <= capacity:
+            tree[i] += delta
+            i += i & -i
+
+    def pop(self, k):
+        """Remove and return the k-th (0-based) queued process."""
+        if not 0 <= k < self._count:
+            raise IndexError("pop index out of range")
+        tree = self._tree
+        capacity = len(tree) - 1
+        pos = 0
+        step = self._step
+        while step:
+            nxt = pos + step
+            if nxt <= capacity and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        process = self._slots[pos]
+        self._slots[pos] = None
+        self._add(pos + 1, -1)
+        self._count -= 1
+        return process
+
+
+class RLOnline(OnlineScheduler):
+    """
+    Greedy dispatcher over a trained Q-table, e.g. a memory-mapped one from
+    from_q_table_file(). Ready processes are ordered by submission, so action
+    indexes follow the offline ready-list order when processes are submitted
+    in index order. State features come from ReadyStats and the chosen process
+    is taken from a _SlotQueue, both in O(log n).
+    """
+
+    def __init__(self, rl, history=10000):
+        super().__init__(history)
+        self.rl = rl
+        self._ready = _SlotQueue()  # in submission order
+        self._stats = ReadyStats()
+
+    @classmethod
+    def from_q_table_file(cls, filepath, history=10000):
+        from scheduler.rl_scheduler import RLScheduler
+
+        rl = RLScheduler([])
+        rl.load_q_table(filepath)
+        return cls(rl, history)
+
+    def _push(self, process, seq):
+        self._ready.append(process)
+        self._stats.add(process.burst, process.priority)
+
+    def _pop(self, now):
+        q_values = self.rl.q_table.get(self.rl.get_state(now, self._stats))
+        if q_values is None:
+            action_index = random.choice(range(len(self._ready)))
+        else:
+            action_index = int(np.argmax(q_values))
+        process = self._ready.pop(action_index)
+        self._stats.remove(process.burst, process.priority)
+        return process
+
+    def __len__(self):
+        return len(self._ready)
+
+
+def replay(scheduler, processes):
+    """
+    Drive an online scheduler through a complete workload, as a live dispatcher
+    would see it. Returns (processes, gantt) like the offline schedulers.
+    """
+    pending = sorted(processes, key=lambda p: p.arrival)
+    gantt = []
+    i = 0
+    now = 0
+    while i < len(pending) or len(scheduler) or scheduler.running is not None:
+        while i < len(pending) and pending[i].arrival <= now:
+            scheduler.submit(pending[i])
+            i += 1
+        decision = scheduler.next_decision(now)
+        if decision is not None:
+            gantt.append(tuple(decision))
+        # Next event: the end of the running slice, else the next arrival
+        if scheduler.busy_until is not None:
+            now = scheduler.busy_until
+        elif i < len(pending):
+            now = max(now, pending[i].arrival)
+        else:
+            break
+    scheduler.advance(now)
+    return pending, gantt
@@ -0,0 +1,84 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from scheduler.q_table import QTable
+from scheduler.rl_scheduler import RLScheduler
+
+
+def dataset_seeds(seed, n):
+    """Independent, reproducible per-dataset seeds derived from one master seed."""
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n)]
+
+
+def _train_chunk(chunk, params):
+    """
+    Worker entry point: train a fresh RLScheduler on each (index, seed, processes)
+    in chunk and fold the tables together by visit-weighted averaging.
+    """
+    merged = QTable()
+    rewards = {}
+    for index, seed, processes in chunk:
+        random.seed(seed)
+        trainer = RLScheduler(processes, episodes=params["episodes"], alpha=params["alpha"],
+                              gamma=params["gamma"], epsilon=params["epsilon"])
+        history = []
+        trainer.train(log_rewards=history, reward_mode=params["reward_mode"])
+        merged.merge(trainer.q_table)
+        rewards[index] = history
+    return merged, rewards
+
+
+def train_parallel(datasets, episodes=200, alpha=0.1, gamma=0.95, epsilon=0.2, reward_mode="combined",
+                   workers=None, seed=None, log_rewards=None, progress=None):
+    """
+    Train one RLScheduler per dataset across a process pool and merge the results.
+
+    datasets: list of process lists
+    workers: pool size (defaults to os.cpu_count()); 1 trains in-process
+    seed: master seed; each dataset gets its own derived seed, so the merged
+          table does not depend (beyond float rounding) on the worker count
+    log_rewards: optional list, extended with per-episode rewards in dataset order
+    progress: optional callback(done_datasets, total_datasets)
+
+    Returns the merged QTable.
+    """
+    params = dict(episodes=episodes, alpha=alpha, gamma=gamma, epsilon=epsilon, reward_mode=reward_mode)
+    total = len(datasets)
+    workers = min(workers or os.cpu_count() or 1, max(total, 1))
+    jobs = list(zip(range(total), dataset_seeds(seed, total), datasets))
+
+    if workers == 1:
+        results = []
+        for job in jobs:
+            results.append(_train_chunk([job], params))
+            if progress is not None:
+                progress(len(results), total)
+    else:
+        # A few chunks per worker keeps the pool balanced without paying
+        # a Q-table transfer per dataset.
+        n_chunks = min(total, workers * 4)
+        chunks = [jobs[i::n_chunks] for i in range(n_chunks)]
+        results = [None] * n_chunks
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_train_chunk, chunk, params): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done += len(chunks[futures[future]])
+                if progress is not None:
+                    progress(done, total)
+
+    # Merge in submission order so the result does not depend on completion order
+    merged = QTable()
+    rewards = {}
+    for table, chunk_rewards in results:
+        merged.merge(table)
+        rewards.update(chunk_rewards)
+
+    if log_rewards is not None:
+        for index in range(total):
+            log_rewards.extend(rewards[index])
+    return merged
@@ -0,0 +1,276 @@
+import numpy as np
+
+EVICTION_POLICIES = ("visits", "lru")
+# Approximate interpreter memory per state for its key tuple and index entry
+STATE_OVERHEAD = 240
+
+
+class QTable:
+    """
+    Dense Q-table backed by a single growable float32 matrix.
+
+    State tuples are interned to row ids; each row is padded to the widest
+    action set seen so far. Padding holds -inf, so a plain argmax/max over a
+    row, or over a batch of rows, never selects a masked action.
+
+    visits counts TD updates per (state, action); merge() uses it to combine
+    tables learned independently, e.g. by parallel training workers.
+    last_used stamps each row with the update clock when it was last interned
+    or updated, for least-recently-used eviction (see evict).
+
+    Values are stored, and TD updates rounded, in float32, so seeded training
+    does not reproduce the float64 dict-of-arrays table it replaced: Q-values
+    that were distinct in float64 can round to a tie (argmax then picks the
+    first action) and the greedy decisions drift apart from there.
+
+    Also implements the read side of the dict protocol (in, [], get, items)
+    so it can be used wherever a {state: q_values} mapping was expected.
+    """
+
+    def __init__(self, capacity=1024, width=1):
+        self.index = {}
+        self.states = []
+        self.values = np.full((capacity, width), -np.inf, dtype=np.float32)
+        self.widths = np.zeros(capacity, dtype=np.int32)
+        self.visits = np.zeros((capacity, width), dtype=np.int32)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.clock = 0
+        self.generation = 0  # bumped whenever rows are renumbered or bulk-changed (merge, keep_rows)
+
+    def __len__(self):
+        return len(self.states)
+
+    def _grow(self, rows, width):
+        capacity, current_width = self.values.shape
+        new_capacity = max(capacity, 1)
+        while new_capacity < rows:
+            new_capacity *= 2
+        new_width = max(current_width, width)
+
+        values = np.full((new_capacity, new_width), -np.inf, dtype=np.float32)
+        values[:capacity, :current_width] = self.values
+        widths = np.zeros(new_capacity, dtype=np.int32)
+        widths[:capacity] = self.widths
+        visits = np.zeros((new_capacity, new_width), dtype=np.int32)
+        visits[:capacity, :current_width] = self.visits
+        last_used = np.zeros(new_capacity, dtype=np.int64)
+        last_used[:capacity] = self.last_used
+        self.values = values
+        self.widths = widths
+        self.visits = visits
+        self.last_used = last_used
+
+    def intern(self, state, n_actions):
+        """Return the row id of state, adding a zero-initialised row with n_actions actions if new."""
+        row = self.index.get(state)
+        if row is None:
+            row = len(self.states)
+            if row >= self.values.shape[0] or n_actions > self.values.shape[1]:
+                self._grow(row + 1, n_actions)
+            self.values[row, :n_actions] = 0
+            self.widths[row] = n_actions
+            self.last_used[row] = self.clock
+            self.index[state] = row
+            self.states.append(state)
+        return row
+
+    def lookup(self, state):
+        """Row id of state, or -1 if it has never been seen."""
+        return self.index.get(state, -1)
+
+    def row_values(self, row):
+        return self.values[row, :self.widths[row]]
+
+    def best_action(self, row):
+        return int(self.values[row].argmax())
+
+    def best_value(self, row):
+        return self.values[row].max()
+
+    def best_actions(self, rows):
+        return self.values[rows].argmax(axis=1)
+
+    def best_values(self, rows):
+        return self.values[rows].max(axis=1)
+
+    def lookup_best_actions(self, states):
+        """Greedy action per state in one vectorized argmax; -1 for unseen states."""
+        get = self.index.get
+        rows = np.fromiter((get(state, -1) for state in states), dtype=np.int64, count=len(states))
+        actions = np.full(len(states), -1, dtype=np.int64)
+        found = rows >= 0
+        if found.any():
+            actions[found] = self.best_actions(rows[found])
+        return actions
+
+    def td_update(self, row, action, target, alpha):
+        """Move Q(row, action) toward target; returns the size of the change."""
+        q = self.values[row, action]
+        delta = alpha * (target - q)
+        self.values[row, action] = q + delta
+        self.visits[row, action] += 1
+        self.clock += 1
+        self.last_used[row] = self.clock
+        return abs(delta)
+
+    def merge(self, other):
+        """
+        Fold another QTable into this one. Q-values of shared state-actions are
+        averaged weighted by visit count, visit counts are summed, and states
+        only present in other are copied.
+        """
+        n = len(other)
+        if not n:
+            return self
+        rows = np.fromiter((self.intern(state, width) for state, width in zip(other.states, other.widths[:n].tolist())),
+                           dtype=np.int64, count=n)
+        width = other.values.shape[1]
+        if width > self.values.shape[1]:
+            self._grow(len(self.states), width)
+
+        mine_q = self.values[rows, :width]
+        mine_n = self.visits[rows, :width].astype(np.int64)
+        theirs_q = other.values[:n]
+        theirs_n = other.visits[:n].astype(np.int64)
+        total = mine_n + theirs_n
+        valid = np.isfinite(theirs_q)
+
+        with np.errstate(invalid="ignore"):
+            weighted = (np.where(mine_n > 0, mine_q, 0) * mine_n + np.where(valid, theirs_q, 0) * theirs_n) / total
+        merged = np.where(total > 0, weighted, np.where(valid, theirs_q, mine_q))
+        # Keep masked padding as -inf wherever neither table has the action
+        merged = np.where(valid | np.isfinite(mine_q), merged, -np.inf)
+
+        self.values[rows, :width] = merged
+        self.visits[rows, :width] = np.minimum(total, np.iinfo(np.int32).max)
+        self.widths[rows] = np.maximum(self.widths[rows], other.widths[:n])
+        self.clock = max(self.clock, other.clock)
+        self.last_used[rows] = np.maximum(self.last_used[rows], other.last_used[:n])
+        self.generation += 1
+        return self
+
+    # maintenance
+
+    def state_visits(self):
+        """Total TD updates per state."""
+        return self.visits[:len(self.states)].sum(axis=1, dtype=np.int64)
+
+    def row_bytes(self):
+        """Approximate memory per stored state: its array row plus key and index overhead."""
+        width = self.values.shape[1]
+        return width * (self.values.itemsize + self.visits.itemsize) + self.widths.itemsize + \
+            self.last_used.itemsize + STATE_OVERHEAD
+
+    def memory_bytes(self):
+        """
+        Approximate size of the stored states. Spare capacity is left out: it is at
+        most the table size again, and counting it would make a table just shrunk
+        by keep_rows look over budget again after its next intern.
+        """
+        return len(self.states) * self.row_bytes()
+
+    def keep_rows(self, rows):
+        """
+        Keep only the given rows, in ascending order, and shrink the arrays to fit.
+        Row ids are renumbered, so this must not run while row ids are held,
+        e.g. in the middle of an episode.
+        """
+        rows = np.sort(np.asarray(rows, dtype=np.int64))
+        n = len(rows)
+        width = max(int(self.widths[rows].max()) if n else 1, 1)
+        self.values = self.values[rows, :width].copy()
+        self.visits = self.visits[rows, :width].copy()
+        self.widths = self.widths[rows].copy()
+        self.last_used = self.last_used[rows].copy()
+        states = self.states
+        self.states = [states[i] for i in rows.tolist()]
+        self.index = {state: row for row, state in enumerate(self.states)}
+        self.generation += 1
+        if not n:
+            self._grow(1, 1)
+        return self
+
+    def evict(self, max_states=None, max_bytes=None, policy="visits", low_water=0.9):
+        """
+        Drop states until at most max_states remain and memory_bytes() fits
+        max_bytes. Evicts down to low_water of the limit, so a table growing
+        between calls is not trimmed every time. policy "visits" drops the
+        least-updated states, "lru" the least recently used ones; ties go to
+        the other criterion. Returns the number of states evicted.
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unsupported eviction policy {policy!r}; expected one of {EVICTION_POLICIES}")
+        if not 0 < low_water <= 1:
+            raise ValueError(f"low_water must be in (0, 1], got {low_water}")
+        n = len(self.states)
+        limit = n
+        if max_states is not None:
+            limit = min(limit, max_states)
+        if max_bytes is not None:
+            limit = min(limit, max_bytes // self.row_bytes())
+        if limit >= n:
+            return 0
+        target = int(limit * low_water)
+
+        visits = self.state_visits()
+        last_used = self.last_used[:n]
+        if policy == "visits":
+            order = np.lexsort((last_used, visits))
+        else:
+            order = np.lexsort((visits, last_used))
+        self.keep_rows(order[n - target:])
+        return n - target
+
+    # dict-style access
+
+    def __contains__(self, state):
+        return state in self.index
+
+    def __getitem__(self, state):
+        return self.row_values(self.index[state])
+
+    def __setitem__(self, state, q_values):
+        q_values = np.asarray(q_values, dtype=np.float32).ravel()
+        row = self.index.get(state)
+        if row is not None and len(q_values) > self.widths[row]:
+            self._grow(len(self.states), len(q_values))
+        row = self.intern(state, len(q_values))
+        self.values[row, :len(q_values)] = q_values
+        self.values[row, len(q_values):] = -np.inf
+        self.visits[row, len(q_values):] = 0
+        self.widths[row] = len(q_values)
+
+    def get(self, state, default=None):
+        row = self.index.get(state)
+        if row is None:
+            return default
+        return self.row_values(row)
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def keys(self):
+        return list(self.states)
+
+    def items(self):
+        for row, state in enumerate(self.states):
+            yield state, self.row_values(row)
+
+    def update(self, other):
+        """dict.update semantics: rows of other replace rows with the same state."""
+        for state, q_values in other.items():
+            self[state] = q_values
+
+    def to_dict(self):
+        return {state: np.array(q_values, dtype=np.float64) for state, q_values in self.items()}
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        table = cls(capacity=max(len(mapping), 1))
+        for state, q_values in mapping.items():
+            table[state] = q_values
+        return table
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.widths.nbytes + self.visits.nbytes + self.last_used.nbytes
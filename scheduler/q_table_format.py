@@ -0,0 +1,428 @@
+"""
+Versioned binary Q-table format.
+
+Layout (little-endian, every section 8-byte aligned):
+    header   128 bytes: magic, version, key_width, n_states, n_values,
+             keys_offset, offsets_offset, values_offset, schema, value_type,
+             visits_offset, scales_offset
+    keys     int32[n_states, key_width], sorted bytewise so rows can be binary searched
+    offsets  int64[n_states + 1], Q-values of row i are values[offsets[i]:offsets[i + 1]]
+    values   float32, float16 or int8[n_values]
+    visits   uint32[n_states], TD updates per state
+    scales   float32[n_states], int8 tables only: Q = value * scale, -128 is -inf
+
+Version 1 files (64-byte header, float32 values, no visits) are still read.
+
+State keys are the aggregate tuples produced by RLScheduler.get_state. The idle
+state ("idle",) is stored as an all-zero row; real states always have num_ready >= 1
+in column 1, so the two cannot collide. schema records which get_state layout
+the keys follow; STATE_SCHEMA must be bumped whenever get_state changes, and
+tables written under another schema are refused rather than silently never
+matching.
+"""
+
+import argparse
+import json
+import struct
+
+import numpy as np
+
+from scheduler.q_table import EVICTION_POLICIES, QTable
+
+MAGIC = b"RLQTABLE"
+VERSION = 2
+STATE_SCHEMA = 1
+KEY_WIDTH = 8
+IDLE_STATE = ("idle",)
+VALUE_TYPES = ("float32", "float16", "int8")
+
+_HEADER_V1 = struct.Struct("<8sIIQQQQQ")
+_HEADER = struct.Struct("<8sIIQQQQQIIQQ")
+_HEADER_SIZE = 128
+_KEY_DTYPE = np.dtype("<i4")
+_KEY_MIN, _KEY_MAX = -2 ** 31, 2 ** 31 - 1
+_OFFSET_DTYPE = np.dtype("<i8")
+_VALUE_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2"), "int8": np.dtype("i1")}
+_VISIT_DTYPE = np.dtype("<u4")
+_SCALE_DTYPE = np.dtype("<f4")
+_INT8_MASKED = -128
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _void_view(keys):
+    keys = np.ascontiguousarray(keys, dtype=_KEY_DTYPE)
+    return keys.view(np.dtype((np.void, keys.shape[-1] * _KEY_DTYPE.itemsize))).ravel()
+
+
+def encode_state(state):
+    """Return the fixed-width key row for a state tuple, or None if it is not representable."""
+    if tuple(state) == IDLE_STATE:
+        return [0] * KEY_WIDTH
+    if len(state) != KEY_WIDTH or not all(isinstance(v, (int, np.integer)) for v in state):
+        return None
+    row = [int(v) for v in state]
+    if min(row) < _KEY_MIN or max(row) > _KEY_MAX:
+        return None
+    return row
+
+
+def decode_state(row):
+    if not row[1]:
+        return IDLE_STATE
+    return tuple(int(v) for v in row)
+
+
+def is_current_state(state):
+    """True if state has the layout RLScheduler.get_state produces under STATE_SCHEMA."""
+    return encode_state(state) is not None
+
+
+def _flatten(q_table):
+    """
+    Keys (sorted), offsets, float32 values and per-state visits of the current
+    schema states of a mapping, plus the number of stale states left out.
+    """
+    rows = []
+    values = []
+    current = []
+    for state, q_values in q_table.items():
+        row = encode_state(state)
+        current.append(row is not None)
+        if row is not None:
+            rows.append(row)
+            values.append(np.asarray(q_values, dtype=np.float32).ravel())
+
+    current = np.array(current, dtype=bool)
+    state_visits = getattr(q_table, "state_visits", None)
+    visits = np.asarray(state_visits(), dtype=np.int64)[current] if state_visits is not None \
+        else np.zeros(len(rows), dtype=np.int64)
+
+    keys = np.array(rows, dtype=_KEY_DTYPE).reshape(len(rows), KEY_WIDTH)
+    order = np.argsort(_void_view(keys), kind="stable")
+    keys = keys[order]
+    values = [values[i] for i in order]
+    visits = visits[order]
+
+    lengths = np.fromiter((len(v) for v in values), dtype=_OFFSET_DTYPE, count=len(values))
+    offsets = np.zeros(len(values) + 1, dtype=_OFFSET_DTYPE)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.concatenate(values) if values else np.zeros(0, dtype=np.float32)
+    return keys, offsets, flat, visits, len(current) - len(rows)
+
+
+def quantize(flat, offsets, value_type):
+    """(stored values, per-state scales or None) of float32 Q-values in value_type."""
+    if value_type not in VALUE_TYPES:
+        raise ValueError(f"Unsupported value type {value_type!r}; expected one of {VALUE_TYPES}")
+    if value_type == "float32":
+        return flat.astype(_VALUE_DTYPES["float32"]), None
+    if value_type == "float16":
+        # Saturate rather than overflow to -inf, which would erase the ordering
+        limit = np.finfo(np.float16).max
+        clipped = np.where(np.isfinite(flat), np.clip(flat, -limit, limit), flat)
+        return clipped.astype(_VALUE_DTYPES["float16"]), None
+
+    # int8: symmetric scale per state, so small- and large-valued states keep their resolution
+    widths = np.diff(offsets)
+    finite = np.isfinite(flat)
+    nonempty = widths > 0
+    peak = np.zeros(len(widths), dtype=np.float32)
+    if len(flat):
+        peak[nonempty] = np.maximum.reduceat(np.where(finite, np.abs(flat), 0), offsets[:-1][nonempty])
+    scales = np.where(peak > 0, peak / 127, 1).astype(_SCALE_DTYPE)
+    scaled = np.clip(np.rint(np.where(finite, flat, 0) / np.repeat(scales, widths)), -127, 127)
+    return np.where(finite, scaled, _INT8_MASKED).astype(_VALUE_DTYPES["int8"]), scales
+
+
+def dequantize(stored, offsets, scales=None):
+    """float32 Q-values from the output of quantize."""
+    if scales is None:
+        return stored.astype(np.float32)
+    values = stored.astype(np.float32) * np.repeat(scales, np.diff(offsets))
+    return np.where(stored == _INT8_MASKED, -np.inf, values).astype(np.float32)
+
+
+def segment_argmax(flat, offsets):
+    """Position of the first maximum in each segment flat[offsets[i]:offsets[i + 1]]; -1 for empty ones."""
+    widths = np.diff(offsets)
+    actions = np.full(len(widths), -1, dtype=np.int64)
+    nonempty = widths > 0
+    if not len(flat):
+        return actions
+    starts = offsets[:-1][nonempty]
+    peak = np.maximum.reduceat(flat, starts)
+    position = np.arange(len(flat)) - np.repeat(offsets[:-1], widths)
+    first = np.where(flat == np.repeat(peak, widths[nonempty]), position, np.iinfo(np.int64).max)
+    actions[nonempty] = np.minimum.reduceat(first, starts)
+    return actions
+
+
+def policy_agreement(q_table, value_type):
+    """
+    Fraction of states whose greedy action survives quantizing q_table to
+    value_type, i.e. how often a table saved that way acts the same.
+    """
+    _, offsets, flat, _, _ = _flatten(q_table)
+    if len(offsets) <= 1:
+        return 1.0
+    stored, scales = quantize(flat, offsets, value_type)
+    before = segment_argmax(flat, offsets)
+    after = segment_argmax(dequantize(stored, offsets, scales), offsets)
+    return float(np.mean(before == after))
+
+
+def save_q_table(q_table, filepath, value_type="float32"):
+    """
+    Write a {state: q_values} mapping in the binary format, with Q-values
+    stored as value_type (see VALUE_TYPES; check the loss with policy_agreement).
+    Returns the number of states skipped because they do not fit the current
+    state schema.
+    """
+    keys, offsets, flat, visits, skipped = _flatten(q_table)
+    stored, scales = quantize(flat, offsets, value_type)
+    visits = np.minimum(visits, np.iinfo(_VISIT_DTYPE).max).astype(_VISIT_DTYPE)
+    if scales is None:
+        scales = np.zeros(0, dtype=_SCALE_DTYPE)
+
+    sections = [keys, offsets, stored, visits, scales]
+    section_offsets = []
+    position = _HEADER_SIZE
+    for section in sections:
+        section_offsets.append(position)
+        position = _align(position + section.nbytes)
+    keys_offset, offsets_offset, values_offset, visits_offset, scales_offset = section_offsets
+    header = _HEADER.pack(MAGIC, VERSION, KEY_WIDTH, len(keys), len(stored), keys_offset, offsets_offset,
+                          values_offset, STATE_SCHEMA, VALUE_TYPES.index(value_type), visits_offset,
+                          scales_offset)
+
+    with open(filepath, "wb") as f:
+        f.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for offset, section in zip(section_offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section.tobytes())
+    return skipped
+
+
+class MappedQTable:
+    """
+    Read-only, memory-mapped view of a binary Q-table.
+
+    Supports the mapping operations RLScheduler.schedule needs (`in`, `[]`, get)
+    and looks states up by binary search without deserializing the table.
+    Quantized values are dequantized per lookup; greedy actions are taken on
+    the stored values directly, which preserves their order.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        raw = np.memmap(filepath, dtype=np.uint8, mode="r")
+        magic, version = struct.unpack("<8sI", bytes(raw[:12]))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a binary Q-table")
+        if version == 1:
+            _, _, key_width, n_states, n_values, keys_offset, offsets_offset, values_offset = \
+                _HEADER_V1.unpack(bytes(raw[:_HEADER_V1.size]))
+            schema, value_code, visits_offset, scales_offset = 1, 0, None, None
+        elif version == VERSION:
+            _, _, key_width, n_states, n_values, keys_offset, offsets_offset, values_offset, schema, value_code, \
+                visits_offset, scales_offset = _HEADER.unpack(bytes(raw[:_HEADER.size]))
+        else:
+            raise ValueError(f"Unsupported Q-table format version {version} in {filepath}")
+        if schema != STATE_SCHEMA:
+            raise ValueError(f"{filepath} uses state schema {schema}, but RLScheduler now produces schema "
+                             f"{STATE_SCHEMA}; its states can never match, retrain the model")
+
+        self._raw = raw
+        self.value_type = VALUE_TYPES[value_code]
+        value_dtype = _VALUE_DTYPES[self.value_type]
+        self.keys = raw[keys_offset:keys_offset + n_states * key_width * _KEY_DTYPE.itemsize].view(_KEY_DTYPE).reshape(n_states, key_width)
+        self.offsets = raw[offsets_offset:offsets_offset + (n_states + 1) * _OFFSET_DTYPE.itemsize].view(_OFFSET_DTYPE)
+        self.values = raw[values_offset:values_offset + n_values * value_dtype.itemsize].view(value_dtype)
+        self.visits = None if visits_offset is None else \
+            raw[visits_offset:visits_offset + n_states * _VISIT_DTYPE.itemsize].view(_VISIT_DTYPE)
+        self.scales = None if self.value_type != "int8" else \
+            raw[scales_offset:scales_offset + n_states * _SCALE_DTYPE.itemsize].view(_SCALE_DTYPE)
+        self._sorted = _void_view(self.keys) if n_states else np.zeros(0, dtype=np.dtype((np.void, key_width * _KEY_DTYPE.itemsize)))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _find(self, state):
+        row = encode_state(state)
+        if row is None or not len(self.keys):
+            return -1
+        needle = _void_view(np.array([row], dtype=_KEY_DTYPE))[0]
+        i = int(np.searchsorted(self._sorted, needle))
+        if i < len(self._sorted) and self._sorted[i] == needle:
+            return i
+        return -1
+
+    def _row(self, i):
+        stored = self.values[self.offsets[i]:self.offsets[i + 1]]
+        if self.scales is None:
+            return stored
+        return np.where(stored == _INT8_MASKED, -np.inf, stored * self.scales[i]).astype(np.float32)
+
+    def __contains__(self, state):
+        return self._find(state) >= 0
+
+    def __getitem__(self, state):
+        i = self._find(state)
+        if i < 0:
+            raise KeyError(state)
+        return self._row(i)
+
+    def get(self, state, default=None):
+        i = self._find(state)
+        if i < 0:
+            return default
+        return self._row(i)
+
+    def lookup_best_actions(self, states):
+        """
+        Greedy action per state with one batched binary search and a padded
+        argmax over the matched value segments; -1 for unknown states.
+        """
+        actions = np.full(len(states), -1, dtype=np.int64)
+        encoded = [encode_state(state) for state in states]
+        valid = np.array([row is not None for row in encoded], dtype=bool)
+        if not valid.any() or not len(self.keys):
+            return actions
+
+        needles = _void_view(np.array([row for row in encoded if row is not None], dtype=_KEY_DTYPE))
+        pos = np.minimum(np.searchsorted(self._sorted, needles), len(self._sorted) - 1)
+        hit = self._sorted[pos] == needles
+        rows = pos[hit]
+        if not len(rows):
+            return actions
+
+        starts = self.offsets[rows]
+        widths = self.offsets[rows + 1] - starts
+        cols = np.arange(max(int(widths.max()), 1))
+        index = starts[:, None] + cols
+        in_row = cols < widths[:, None]
+        segment = np.where(in_row, self.values[np.minimum(index, max(len(self.values) - 1, 0))], -np.inf)
+
+        targets = np.flatnonzero(valid)[hit]
+        actions[targets] = segment.argmax(axis=1)
+        return actions
+
+    def state_visits(self):
+        """TD updates per state, in items() order; zeros for version 1 files."""
+        if self.visits is None:
+            return np.zeros(len(self.keys), dtype=np.int64)
+        return self.visits.astype(np.int64)
+
+    def items(self):
+        for i, row in enumerate(self.keys.tolist()):
+            yield decode_state(row), self._row(i)
+
+    def __iter__(self):
+        for row in self.keys.tolist():
+            yield decode_state(row)
+
+    def to_dict(self):
+        return {state: np.array(q_values, dtype=np.float64) for state, q_values in self.items()}
+
+    def to_qtable(self):
+        """
+        Deserialize into a writable QTable, e.g. to continue training. Per-state
+        visit counts are spread evenly over the state's actions.
+        """
+        n = len(self.keys)
+        widths = np.diff(self.offsets).astype(np.int32)
+        table = QTable(capacity=max(n, 1), width=max(int(widths.max()) if n else 1, 1))
+        rows = np.repeat(np.arange(n), widths)
+        cols = np.arange(len(self.values)) - np.repeat(self.offsets[:-1], widths)
+        table.values[rows, cols] = dequantize(np.asarray(self.values), self.offsets, self.scales)
+        visits = self.state_visits()
+        safe = np.maximum(widths, 1)
+        share = visits // safe
+        table.visits[rows, cols] = (np.repeat(share, widths) + (cols < np.repeat(visits - share * safe, widths)))
+        table.widths[:n] = widths
+        table.states = [decode_state(row) for row in self.keys.tolist()]
+        table.index = {state: row for row, state in enumerate(table.states)}
+        return table
+
+
+def load_q_table(filepath, mmap=True):
+    table = MappedQTable(filepath)
+    return table if mmap else table.to_qtable()
+
+
+def load_yaml_q_table(yaml_path):
+    """
+    ({state: q_values} of the current schema, stale keys skipped) from a YAML
+    Q-table written by RLScheduler.save_q_table_yaml. Stale keys use the old
+    per-process state schema and can never be produced by get_state.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(yaml_path, "r") as f:
+        loaded = yaml.load(f, Loader=loader)
+
+    q_table = {}
+    skipped = 0
+    for state_str, q_values in (loaded or {}).items():
+        state = tuple(json.loads(state_str))
+        if not is_current_state(state):
+            skipped += 1
+            continue
+        q_table[state] = q_values
+    return q_table, skipped
+
+
+def convert_yaml_q_table(yaml_path, bin_path, value_type="float32"):
+    """
+    One-shot conversion of a YAML Q-table written by RLScheduler.save_q_table_yaml.
+    Returns (states written, stale states skipped).
+    """
+    q_table, skipped = load_yaml_q_table(yaml_path)
+    unrepresentable = save_q_table(q_table, bin_path, value_type)
+    return len(q_table) - unrepresentable, skipped + unrepresentable
+
+
+def compact_q_table(in_path, out_path, max_states=None, max_bytes=None, policy="visits", value_type="float32"):
+    """
+    Rewrite a YAML or binary Q-table within a budget: stale states dropped,
+    states evicted down to max_states / max_bytes in memory (see QTable.evict),
+    Q-values stored as value_type. Returns a dict of what was done, including
+    the policy agreement of the quantized table.
+    """
+    if str(in_path).endswith((".yaml", ".yml")):
+        mapping, stale = load_yaml_q_table(in_path)
+        table = QTable.from_mapping(mapping)
+    else:
+        table, stale = load_q_table(in_path, mmap=False), 0
+    states = len(table)
+    evicted = table.evict(max_states=max_states, max_bytes=max_bytes, policy=policy, low_water=1.0)
+    agreement = policy_agreement(table, value_type)
+    save_q_table(table, out_path, value_type)
+    return {"states": states, "stale": stale, "evicted": evicted, "written": len(table),
+            "policy_agreement": agreement}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert, trim and quantize Q-tables.")
+    parser.add_argument("source", help="YAML or binary Q-table")
+    parser.add_argument("out", help="binary Q-table to write")
+    parser.add_argument("--max-states", type=int)
+    parser.add_argument("--max-bytes", type=int, help="in-memory budget of the loaded table")
+    parser.add_argument("--policy", choices=EVICTION_POLICIES, default="visits")
+    parser.add_argument("--value-type", choices=VALUE_TYPES, default="float32")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = compact_q_table(args.source, args.out, args.max_states, args.max_bytes, args.policy, args.value_type)
+    print(f"Wrote {result['written']} states to {args.out} ({result['stale']} stale keys skipped, "
+          f"{result['evicted']} evicted, {result['policy_agreement']:.2%} policy agreement as {args.value_type})")
+
+
+if __name__ == "__main__":
+    main()
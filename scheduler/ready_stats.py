@@ -0,0 +1,95 @@
+import heapq
+
+
+class LazyMinMax:
+    """
+    Multiset of numbers with O(log n) add/remove and amortised O(1) min/max.
+
+    Removals are recorded in a pending-deletion count and only applied when the
+    removed value reaches the top of the min or max heap.
+    """
+
+    def __init__(self):
+        self._lo = []
+        self._hi = []
+        self._lo_dead = {}
+        self._hi_dead = {}
+
+    def clear(self):
+        self._lo.clear()
+        self._hi.clear()
+        self._lo_dead.clear()
+        self._hi_dead.clear()
+
+    def add(self, value):
+        heapq.heappush(self._lo, value)
+        heapq.heappush(self._hi, -value)
+
+    def remove(self, value):
+        self._lo_dead[value] = self._lo_dead.get(value, 0) + 1
+        self._hi_dead[-value] = self._hi_dead.get(-value, 0) + 1
+
+    @staticmethod
+    def _top(heap, dead):
+        while dead:
+            top = heap[0]
+            pending = dead.get(top)
+            if not pending:
+                break
+            heapq.heappop(heap)
+            if pending == 1:
+                del dead[top]
+            else:
+                dead[top] = pending - 1
+        return heap[0]
+
+    def min(self):
+        return self._top(self._lo, self._lo_dead)
+
+    def max(self):
+        return -self._top(self._hi, self._hi_dead)
+
+
+class ReadyStats:
+    """
+    Running aggregates of the ready set: count, burst/priority sums and min/max.
+    Updated as processes arrive and complete so that the RL state is O(1)/O(log n).
+    """
+
+    def __init__(self):
+        self.bursts = LazyMinMax()
+        self.priorities = LazyMinMax()
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.burst_sum = 0
+        self.priority_sum = 0
+        self.bursts.clear()
+        self.priorities.clear()
+
+    def add(self, burst, priority):
+        self.count += 1
+        self.burst_sum += burst
+        self.priority_sum += priority
+        self.bursts.add(burst)
+        self.priorities.add(priority)
+
+    def remove(self, burst, priority):
+        self.count -= 1
+        self.burst_sum -= burst
+        self.priority_sum -= priority
+        if self.count:
+            self.bursts.remove(burst)
+            self.priorities.remove(priority)
+        else:
+            # Empty set: drop the heaps outright instead of accumulating tombstones
+            self.bursts.clear()
+            self.priorities.clear()
+
+    @classmethod
+    def from_processes(cls, processes):
+        stats = cls()
+        for p in processes:
+            stats.add(p.burst, p.priority)
+        return stats
@@ -0,0 +1,103 @@
+from bisect import insort
+
+import numpy as np
+
+from process import ProcessTable
+from scheduler.ready_stats import ReadyStats
+
+REWARD_MODES = ("waiting", "turnaround", "combined")
+
+
+def step_reward(reward_mode, waiting_time, turnaround_time):
+    """Reward of dispatching one process; unknown modes fall back to "waiting". Works on arrays too."""
+    if reward_mode == "turnaround":
+        return -turnaround_time
+    if reward_mode == "combined":
+        return -(waiting_time + turnaround_time)
+    return -waiting_time
+
+
+class SchedulingEnv:
+    """
+    Array-backed simulation of a non-preemptive single CPU, used by RLScheduler.
+
+    Built from a list of Process objects or a ProcessTable. The workload is
+    stored once as NumPy arrays (arrival, burst, priority, done)
+    plus a stable arrival ordering. reset() only rewinds cursors and clears the
+    done mask, so an episode never copies Process objects.
+
+    The ready set is mirrored in a ReadyStats aggregate for O(log n) featurization.
+    The ready list holds process indexes in ascending index order, which keeps
+    action indexes compatible with Q-tables trained on the list-scan version.
+    """
+
+    def __init__(self, processes):
+        if not isinstance(processes, ProcessTable):
+            processes = ProcessTable.from_processes(processes)
+        n = len(processes)
+        self.n = n
+        self.pid = processes.pid.copy()
+        self.arrival = processes.arrival.copy()
+        self.burst = processes.burst.copy()
+        self.priority = processes.priority.copy()
+        self.done = np.zeros(n, dtype=bool)
+        self.start = np.zeros(n, dtype=np.int64)
+        self.completion = np.zeros(n, dtype=np.int64)
+        self.arrival_order = np.argsort(self.arrival, kind="stable")
+
+        # Plain-int mirrors for the per-decision hot path: indexing a NumPy array
+        # with a Python int is several times slower than indexing a list.
+        self._arrival = self.arrival.tolist()
+        self._burst = self.burst.tolist()
+        self._priority = self.priority.tolist()
+        self._order = self.arrival_order.tolist()
+
+        self.ready = []
+        self.stats = ReadyStats()
+        self.reset()
+
+    def reset(self):
+        self.done[:] = False
+        self.ready.clear()
+        self.stats.clear()
+        self.time = 0
+        self.cursor = 0  # position in arrival_order of the next process to arrive
+        self.remaining = self.n
+
+    @property
+    def finished(self):
+        return self.remaining == 0
+
+    def admit(self):
+        """Move every process that has arrived by the current time into the ready list."""
+        order = self._order
+        arrival = self._arrival
+        while self.cursor < self.n and arrival[order[self.cursor]] <= self.time:
+            idx = order[self.cursor]
+            insort(self.ready, idx)
+            self.stats.add(self._burst[idx], self._priority[idx])
+            self.cursor += 1
+
+    def skip_idle(self):
+        """If nothing is ready, jump the clock to the next arrival and admit it."""
+        if not self.ready and self.cursor < self.n:
+            next_arrival = self._arrival[self._order[self.cursor]]
+            if next_arrival > self.time:
+                self.time = next_arrival
+        self.admit()
+
+    def step(self, action_index):
+        """
+        Run the action_index-th ready process to completion.
+        Returns (process index, start time, completion time).
+        """
+        idx = self.ready.pop(action_index)
+        self.stats.remove(self._burst[idx], self._priority[idx])
+        start = self.time
+        self.time = start + self._burst[idx]
+        self.start[idx] = start
+        self.completion[idx] = self.time
+        self.done[idx] = True
+        self.remaining -= 1
+        self.admit()
+        return idx, start, self.time
@@ -1,51 +1,141 @@
-def round_robin(processes, quantum=6):
-    from collections import deque
+from collections import deque, namedtuple
 
-    # Step 1: Initialize process properties
-    for p in processes:
-        p.remaining = p.burst
-        p.start = None
-        p.completion = None
+import numpy as np
+
+from process import ProcessTable
+
+# `repeat` back-to-back rounds in which every pid in the cycle runs one full quantum, in order
+Cycle = namedtuple("Cycle", "pids start quantum repeat")
+
+
+def expand_gantt(gantt):
+    """Yield plain (pid, start, end) slices from a gantt that may hold Cycle runs."""
+    for entry in gantt:
+        if not isinstance(entry, Cycle):
+            yield entry
+            continue
+        pids, time, quantum, repeat = entry
+        for _ in range(repeat):
+            for pid in pids:
+                yield (pid, time, time + quantum)
+                time += quantum
+
+
+def _round_robin_core(arrival, burst, quantum, compress=False):
+    """
+    arrival, burst: lists indexed by position, positions in arrival order.
+    Returns (start, completion, slices) with slices as (position, start, end),
+    plus Cycle runs of positions when compress is set.
+    """
+    n = len(arrival)
+    # Remaining time plus `credit`, the time every queued process has been given by
+    # Cycles, so a Cycle updates no per-process state
+    remaining = list(burst)
+    credit = 0
+    start = [None] * n
+    completion = [None] * n
 
     time = 0
     queue = deque()
-    gantt = []
-    completed = []
+    slices = []
+    completed = 0
     i = 0  # index for arriving processes
-    processes.sort(key=lambda p: p.arrival)
+    unstarted = 0  # queued processes that have not run yet
+    until_check = 0  # slices left before the next attempt to compress
 
-    while len(completed) < len(processes):
-        # Step 2: Add all processes that have arrived by current time
-        while i < len(processes) and processes[i].arrival <= time:
-            queue.append(processes[i])
+    while completed < n:
+        # Add all processes that have arrived by current time
+        while i < n and arrival[i] <= time:
+            queue.append(i)
+            remaining[i] += credit
+            unstarted += 1
             i += 1
 
         if not queue:
-            # CPU is idle, advance time
-            time += 1
+            # CPU is idle, jump to the next arrival
+            time = arrival[i]
             continue
 
+        if compress and until_check <= 0:
+            # Until the next arrival or completion whole rounds just rotate the queue,
+            # so emit them as one Cycle. Only full rounds are compressed, each worth a
+            # slice per process for one copy of the queue; then a round of plain slices
+            # passes before the next attempt, so the scans stay proportional to the output
+            if not unstarted:
+                round_time = len(queue) * quantum
+                repeat = (min(map(remaining.__getitem__, queue)) - credit - 1) // quantum
+                if i < n:
+                    repeat = min(repeat, (arrival[i] - time - 1) // round_time)
+                if repeat > 0:
+                    credit += repeat * quantum
+                    slices.append(Cycle(tuple(queue), time, quantum, repeat))
+                    time += repeat * round_time
+            until_check = len(queue)
+        until_check -= 1
+
         current = queue.popleft()
 
         # Record start time only once
-        if current.start is None:
-            current.start = time
+        if start[current] is None:
+            start[current] = time
+            unstarted -= 1
 
-        run_time = min(current.remaining, quantum)
-        gantt.append((current.pid, time, time + run_time))
+        run_time = min(remaining[current] - credit, quantum)
+        slices.append((current, time, time + run_time))
 
         time += run_time
-        current.remaining -= run_time
+        remaining[current] -= run_time
 
         # Add any newly arrived processes during run time
-        while i < len(processes) and processes[i].arrival <= time:
-            queue.append(processes[i])
+        while i < n and arrival[i] <= time:
+            queue.append(i)
+            remaining[i] += credit
+            unstarted += 1
             i += 1
 
-        if current.remaining > 0:
+        if remaining[current] - credit > 0:
             queue.append(current)
         else:
-            current.completion = time
-            completed.append(current)
+            completion[current] = time
+            completed += 1
+
+    return start, completion, slices
+
+
+def _to_pids(slices, pids):
+    gantt = []
+    for entry in slices:
+        if isinstance(entry, Cycle):
+            gantt.append(entry._replace(pids=tuple(pids[pos] for pos in entry.pids)))
+        else:
+            pos, begin, end = entry
+            gantt.append((pids[pos], begin, end))
+    return gantt
+
+
+def round_robin(processes, quantum=6, compress=False):
+    """
+    compress: record stretches of whole rounds without arrivals or completions
+    as Cycle runs instead of one slice per quantum (see expand_gantt). Start and
+    completion times are the same either way.
+    """
+    if isinstance(processes, ProcessTable):
+        processes.reset()
+        order = np.argsort(processes.arrival, kind="stable")
+        start, completion, slices = _round_robin_core(processes.arrival[order].tolist(),
+                                                      processes.burst[order].tolist(), quantum, compress)
+        processes.start[order] = start
+        processes.completion[order] = completion
+        processes.remaining[order] = 0
+        return processes, _to_pids(slices, processes.pid[order].tolist())
+
+    processes.sort(key=lambda p: p.arrival)
+    start, completion, slices = _round_robin_core([p.arrival for p in processes],
+                                                  [p.burst for p in processes], quantum, compress)
+    for p, p_start, p_completion in zip(processes, start, completion):
+        p.remaining = 0
+        p.start = p_start
+        p.completion = p_completion
+    gantt = _to_pids(slices, [p.pid for p in processes])
 
     return processes, gantt
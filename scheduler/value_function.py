@@ -0,0 +1,223 @@
+"""
+Fixed-size Q-function approximators for RLScheduler.
+
+Instead of one Q-table row per discretized state, Q(state, candidate) is a
+function of a feature vector per ready process, so every ready process is
+scored with one matrix product and unseen states still get a greedy choice.
+Model size depends only on the number of features, never on the workloads seen.
+
+Features of candidate i (times scaled by the workload's mean burst, priorities
+by PRIORITY_SCALE):
+
+    bias, burst, priority, waiting time, burst / longest ready burst,
+    log(1 + ready count), avg/min/max ready burst, avg/min/max ready priority
+
+The last seven are the aggregates of RLScheduler.get_state and are shared by
+all candidates. Rewards are divided by the same time scale, which leaves the
+greedy policy unchanged but keeps TD targets of any workload in a similar range.
+"""
+
+import random
+
+import numpy as np
+
+from scheduler.convergence import ConvergenceMonitor, as_schedule
+from scheduler.rl_env import step_reward
+
+BACKENDS = ("linear", "mlp")
+N_FEATURES = 12
+PRIORITY_SCALE = 10.0
+
+
+def time_scale(env):
+    """Mean burst of the workload, the unit for time features and rewards."""
+    return max(float(env.burst.mean()), 1.0) if env.n else 1.0
+
+
+def candidate_features(env, scale, ready=None):
+    """(len(ready), N_FEATURES) float64 features of the ready processes of env at env.time."""
+    ready = np.array(env.ready if ready is None else ready, dtype=np.int64)
+    stats = env.stats
+    burst = env.burst[ready]
+    count = len(ready)
+
+    features = np.empty((count, N_FEATURES), dtype=np.float64)
+    features[:, 0] = 1.0
+    features[:, 1] = burst / scale
+    features[:, 2] = env.priority[ready] / PRIORITY_SCALE
+    features[:, 3] = (env.time - env.arrival[ready]) / scale
+    longest = stats.bursts.max()
+    features[:, 4] = burst / max(longest, 1)
+    # Aggregates shared by every candidate
+    features[:, 5] = np.log1p(count)
+    features[:, 6] = stats.burst_sum / count / scale
+    features[:, 7] = stats.bursts.min() / scale
+    features[:, 8] = longest / scale
+    features[:, 9] = stats.priority_sum / count / PRIORITY_SCALE
+    features[:, 10] = stats.priorities.min() / PRIORITY_SCALE
+    features[:, 11] = stats.priorities.max() / PRIORITY_SCALE
+    return features
+
+
+class LinearValueFunction:
+    """Q(s, a) = features(s, a) . weights, trained with normalized LMS steps."""
+
+    kind = "linear"
+
+    def __init__(self, n_features=N_FEATURES):
+        self.weights = np.zeros(n_features, dtype=np.float64)
+
+    def scores(self, features):
+        return features @ self.weights
+
+    def update(self, x, target, alpha):
+        """Move Q(x) toward target; the step is divided by |x|^2 so alpha is scale-free. Returns the change."""
+        error = target - x @ self.weights
+        self.weights += alpha * error / (x @ x + 1e-8) * x
+        return abs(alpha * error)
+
+    def parameters(self):
+        return {"weights": self.weights}
+
+    def set_parameters(self, parameters):
+        self.weights = np.array(parameters["weights"], dtype=np.float64)
+
+
+class MLPValueFunction:
+    """
+    Q(s, a) from a one-hidden-layer tanh network over the candidate features,
+    trained by plain SGD on the TD error, clipped to +-clip to keep steps bounded.
+    seed fixes the initial weights, so training seeded through `random` is reproducible.
+    """
+
+    kind = "mlp"
+
+    def __init__(self, n_features=N_FEATURES, hidden=16, seed=0, clip=10.0):
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.normal(0.0, 1.0 / np.sqrt(n_features), (n_features, hidden))
+        self.b1 = np.zeros(hidden)
+        self.w2 = rng.normal(0.0, 1.0 / np.sqrt(hidden), hidden)
+        self.b2 = np.zeros(1)
+        self.clip = clip
+
+    def scores(self, features):
+        return np.tanh(features @ self.w1 + self.b1) @ self.w2 + self.b2[0]
+
+    def update(self, x, target, alpha):
+        hidden = np.tanh(x @ self.w1 + self.b1)
+        error = float(np.clip(target - (hidden @ self.w2 + self.b2[0]), -self.clip, self.clip))
+        step = alpha * error
+        back = step * self.w2 * (1.0 - hidden ** 2)
+        self.w2 += step * hidden
+        self.b2 += step
+        self.w1 += np.outer(x, back)
+        self.b1 += back
+        return abs(step)
+
+    def parameters(self):
+        return {"w1": self.w1, "b1": self.b1, "w2": self.w2, "b2": self.b2, "clip": np.array(self.clip)}
+
+    def set_parameters(self, parameters):
+        self.w1 = np.array(parameters["w1"], dtype=np.float64)
+        self.b1 = np.array(parameters["b1"], dtype=np.float64)
+        self.w2 = np.array(parameters["w2"], dtype=np.float64)
+        self.b2 = np.array(parameters["b2"], dtype=np.float64)
+        self.clip = float(parameters["clip"])
+
+
+def make_value_function(backend, **params):
+    if backend == "linear":
+        return LinearValueFunction(**params)
+    if backend == "mlp":
+        return MLPValueFunction(**params)
+    raise ValueError(f"Unsupported value function backend {backend!r}; expected one of {BACKENDS}")
+
+
+def save_value_function(model, filepath):
+    """Write the model to an .npz file; its size is fixed by the architecture."""
+    np.savez(filepath, kind=np.array(model.kind), **model.parameters())
+
+
+def load_value_function(filepath):
+    with np.load(filepath) as data:
+        kind = str(data["kind"])
+        parameters = {name: data[name] for name in data.files if name != "kind"}
+    if kind == "linear":
+        model = LinearValueFunction(len(parameters["weights"]))
+    elif kind == "mlp":
+        model = MLPValueFunction(*parameters["w1"].shape)
+    else:
+        raise ValueError(f"{filepath} holds an unknown value function {kind!r}")
+    model.set_parameters(parameters)
+    return model
+
+
+def greedy_action(model, env, scale):
+    """Index into env.ready of the highest-scoring ready process."""
+    return int(np.argmax(model.scores(candidate_features(env, scale))))
+
+
+def train_value_function(rl, log_rewards=None, reward_mode="waiting", epsilon_schedule=None, alpha_schedule=None,
+                         convergence=None):
+    """
+    Q-learning of rl.value_function over up to rl.episodes episodes of rl.env,
+    with the same exploration, reward modes, schedules and convergence
+    monitoring as RLScheduler.train. Returns a TrainingReport.
+    """
+    if log_rewards is None:
+        log_rewards = []
+    epsilon_at = as_schedule(rl.epsilon if epsilon_schedule is None else epsilon_schedule)
+    alpha_at = as_schedule(rl.alpha if alpha_schedule is None else alpha_schedule)
+    monitor = convergence if convergence is not None else ConvergenceMonitor(min_episodes=float("inf"))
+    model = rl.value_function
+    env = rl.env
+    scale = time_scale(env)
+    arrival = env._arrival
+    burst = env._burst
+
+    episodes = 0
+    monitor.start()
+    for ep in range(rl.episodes):
+        epsilon = epsilon_at(ep)
+        alpha = alpha_at(ep)
+        env.reset()
+        total_reward = 0
+        max_delta = 0.0
+        features = None
+
+        while not env.finished:
+            if not env.ready:
+                env.skip_idle()
+                features = None
+            if features is None:
+                features = candidate_features(env, scale)
+
+            if random.random() < epsilon:
+                action_index = random.choice(range(len(env.ready)))
+            else:
+                action_index = int(np.argmax(model.scores(features)))
+            chosen = env.ready[action_index]
+
+            waiting_time = env.time - arrival[chosen]
+            reward = step_reward(reward_mode, waiting_time, waiting_time + burst[chosen])
+            total_reward += reward
+
+            x = features[action_index]
+            env.step(action_index)
+            if env.ready:
+                features = candidate_features(env, scale)
+                q_next_max = float(model.scores(features).max())
+            else:
+                features = None
+                q_next_max = 0.0
+
+            delta = model.update(x, reward / scale + rl.gamma * q_next_max, alpha)
+            if delta > max_delta:
+                max_delta = delta
+
+        log_rewards.append(total_reward)
+        episodes += 1
+        if monitor.update(total_reward, max_delta):
+            break
+
+    return monitor.report(episodes)
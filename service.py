@@ -0,0 +1,337 @@
+"""
+Local scheduling service: one warm process that keeps the Q-table and the
+schedulers resident and answers many clients over a socket.
+
+    python service.py --q-table general_q_table.qtb --port 8765
+    python service.py --q-table general_q_table.qtb --unix /tmp/scheduler.sock
+
+The protocol is one JSON object per line in each direction. Requests may be
+pipelined on a connection; every response echoes the request's "id".
+
+    {"id": 1, "op": "decide", "time": 42, "ready": [[burst, priority], ...]}
+    {"id": 2, "op": "decide", "state": [4, 3, 7, 2, 12, 2, 1, 3]}
+    {"id": 3, "op": "simulate", "algorithm": "sjf", "processes": [[pid, arrival, burst, priority], ...]}
+    {"id": 4, "op": "stats"}
+
+"decide" returns the greedy action index (position in the ready list) and
+whether the state was in the Q-table; unseen states get a random action when
+the ready list is known, else null. Decisions arriving within --batch-window-ms
+of each other are answered by one vectorized Q-table lookup. "simulate" runs a
+whole workload ("fcfs", "sjf", "priority", "rr", "rl"; "cores" > 1 uses the
+multi-core simulation) and returns the Gantt chart and averages. "stats" returns
+latency histograms per operation and the decision batch sizes.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from process import ProcessTable
+from scheduler.fcfs import fcfs
+from scheduler.multicore import ALGORITHMS, multicore_schedule
+from scheduler.priority import priority_scheduling
+from scheduler.ready_stats import ReadyStats
+from scheduler.rl_scheduler import RLScheduler
+from scheduler.round_robin import round_robin
+from scheduler.sjf import sjf
+
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_WINDOW = 0.001
+DEFAULT_MAX_BATCH = 1024
+
+
+class Histogram:
+    """Counts in power-of-two buckets: bucket k holds values in [2**(k-1), 2**k)."""
+
+    def __init__(self, buckets=32):
+        self.counts = np.zeros(buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        bucket = min(int(value).bit_length(), len(self.counts) - 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * self.count))
+        return float(min(2 ** bucket, self.max))
+
+    def snapshot(self):
+        used = int(np.flatnonzero(self.counts).max()) + 1 if self.count else 0
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "bucket_upper_bounds": [2 ** k for k in range(used)],
+            "counts": self.counts[:used].tolist(),
+        }
+
+
+def _state(rl, payload):
+    if "state" in payload:
+        state = payload["state"]
+        return ("idle",) if state in ("idle", ["idle"]) else tuple(int(v) for v in state), None
+    ready = payload.get("ready", [])
+    stats = ReadyStats()
+    for burst, priority in ready:
+        stats.add(int(burst), int(priority))
+    return rl.get_state(int(payload.get("time", 0)), stats), len(ready)
+
+
+def _single_cpu(processes, algorithm, quantum, rl_q_table):
+    if algorithm == "fcfs":
+        return fcfs(processes)
+    if algorithm == "sjf":
+        return sjf(processes)
+    if algorithm == "priority":
+        return priority_scheduling(processes)
+    if algorithm == "rr":
+        return round_robin(processes, quantum=quantum)
+    rl = RLScheduler(processes)
+    rl.q_table = rl_q_table
+    return rl.schedule()
+
+
+class SchedulingService:
+    """Resident Q-table plus the request handlers; transport-independent."""
+
+    def __init__(self, q_table_path=None, batch_window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.rl = RLScheduler([])
+        if q_table_path is not None:
+            if q_table_path.endswith((".yaml", ".yml")):
+                self.rl.load_q_table_yaml(q_table_path)
+            else:
+                self.rl.load_q_table(q_table_path)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.latency = {}  # op -> Histogram of microseconds
+        self.batch_sizes = Histogram()
+        self._pending = None
+        self._batcher = None
+
+    async def start(self):
+        self._pending = asyncio.Queue()
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_batches(self):
+        while True:
+            batch = [await self._pending.get()]
+            deadline = asyncio.get_running_loop().time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Drain whatever else is already queued without waiting further
+            while len(batch) < self.max_batch and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+
+            self.batch_sizes.record(len(batch))
+            actions = self.rl.q_table.lookup_best_actions([state for state, _, _ in batch])
+            for (_, n_ready, future), action in zip(batch, actions.tolist()):
+                if not future.done():
+                    future.set_result(action)
+
+    async def decide(self, payload):
+        state, n_ready = _state(self.rl, payload)
+        if state == ("idle",) and n_ready is not None:
+            return {"action": None, "known": False, "state": list(state)}
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((state, n_ready, future))
+        action = await future
+        known = action >= 0
+        if not known:
+            action = random.randrange(n_ready) if n_ready else None
+        return {"action": action, "known": known, "state": list(state)}
+
+    async def simulate(self, payload):
+        algorithm = payload.get("algorithm", "fcfs")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm {algorithm!r}; expected one of {ALGORITHMS}")
+        rows = np.asarray(payload["processes"], dtype=np.int64).reshape(-1, 4)
+        processes = ProcessTable(rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3])
+        quantum = int(payload.get("quantum", 6))
+        cores = int(payload.get("cores", 1))
+
+        def run():
+            if cores > 1:
+                return multicore_schedule(processes, algorithm, cores=cores, policy=payload.get("policy", "global"),
+                                          quantum=quantum, rl=self.rl)
+            return _single_cpu(processes, algorithm, quantum, self.rl.q_table)
+
+        # Simulations are CPU-bound; keep the event loop free for decisions
+        result, gantt = await asyncio.get_running_loop().run_in_executor(None, run)
+        turnaround = result.completion - result.arrival
+        return {
+            "gantt": [list(map(int, entry)) for entry in gantt],
+            "start": result.start.tolist(),
+            "completion": result.completion.tolist(),
+            "avg_turnaround": float(turnaround.mean()) if len(result) else 0.0,
+            "avg_waiting": float((turnaround - result.burst).mean()) if len(result) else 0.0,
+        }
+
+    async def stats(self, payload):
+        return {
+            "q_table_states": len(self.rl.q_table),
+            "latency_us": {op: histogram.snapshot() for op, histogram in self.latency.items()},
+            "decision_batch_sizes": self.batch_sizes.snapshot(),
+        }
+
+    async def handle(self, payload):
+        op = payload.get("op")
+        handler = {"decide": self.decide, "simulate": self.simulate, "stats": self.stats}.get(op)
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown op {op!r}")
+            response = await handler(payload)
+        except Exception as exc:
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        if handler is not None:
+            self.latency.setdefault(op, Histogram()).record((time.perf_counter() - started) * 1e6)
+        response["id"] = payload.get("id")
+        return response
+
+    async def _respond(self, line, writer):
+        try:
+            payload = json.loads(line)
+        except ValueError as exc:
+            response = {"id": None, "error": f"Invalid JSON: {exc}"}
+        else:
+            response = await self.handle(payload)
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def serve_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # One task per request, so pipelined decisions share a batch
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    await service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.serve_connection, path=unix_path)
+    else:
+        server = await asyncio.start_server(service.serve_connection, host, port)
+    where = unix_path or "{}:{}".format(*server.sockets[0].getsockname()[:2])
+    print(f"Scheduling service on {where} ({len(service.rl.q_table)} Q-table states)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+class ServiceClient:
+    """Minimal asyncio client; requests may be issued concurrently on one connection."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+        self._waiting = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._waiting.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self._waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Scheduling service closed the connection"))
+
+    async def request(self, op, **payload):
+        self._next_id += 1
+        payload.update(op=op, id=self._next_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self.writer.write(json.dumps(payload).encode() + b"\n")
+        await self.writer.drain()
+        response = await future
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+
+    async def close(self):
+        self.writer.close()
+        self._receiver.cancel()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--q-table", help="binary .qtb (memory-mapped) or legacy YAML Q-table")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW * 1000,
+                        help="how long a decision waits for others to share its Q-table lookup")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    service = SchedulingService(args.q_table, batch_window=args.batch_window_ms / 1000, max_batch=args.max_batch)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,182 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import random
-from process import Process
+import numpy as np
+from loader import columns_from_frame, processes_from_columns
 from scheduler.fcfs import fcfs
 from scheduler.sjf import sjf
 from scheduler.round_robin import round_robin
 from scheduler.priority import priority_scheduling
 from scheduler.rl_scheduler import RLScheduler
+from scheduler.checkpoint import TrainingCheckpoint
+from scheduler.convergence import ConvergenceMonitor, ExponentialDecay
+from scheduler.q_table_format import convert_yaml_q_table
+from scheduler.parallel_training import train_parallel
+from metrics import TIMES, process_times, schedule_columns, schedule_metrics
 from utils import calculate_metrics
-from visualizer import plot_gantt_chart
+from workload_generator import ARRIVALS, BURSTS, generate_columns, generate_frame
+from visualizer import DEFAULT_MAX_SLICES, plot_gantt_chart
+import hashlib
 import io
 import os
+import shutil
+import threading
+from collections import OrderedDict
+
+MODEL_PATH = "general_q_table.qtb"
+LEGACY_MODEL_PATH = "general_q_table.yaml"
+RESULT_CACHE_SIZE = 128
+# Retraining merges into the model, so bound it rather than let it grow forever
+MODEL_MEMORY_CAP = 64 * 2 ** 20
+# Per-workload training checkpoints, so a rerun mid-training resumes instead of starting over
+CHECKPOINT_DIR = ".rl_checkpoints"
 
 
 def parse_process_df(df):
-    return [
-        Process(
-            pid=int(row['pid']),
-            arrival=int(row['arrival']),
-            burst=int(row['burst']),
-            priority=int(row.get('priority', 0))
-        ) for _, row in df.iterrows()
-    ]
+    return processes_from_columns(columns_from_frame(df))
+
+
+@st.cache_data(max_entries=16)
+def parse_workload(df):
+    """Typed columns of a process DataFrame plus a digest of their contents."""
+    columns = columns_from_frame(df)
+    digest = hashlib.sha1()
+    for name in sorted(columns):
+        digest.update(columns[name].tobytes())
+    return digest.hexdigest(), columns
+
+
+@st.cache_data(max_entries=8)
+def read_uploaded_csv(data):
+    return pd.read_csv(io.BytesIO(data))
+
+
+@st.cache_resource(max_entries=2)
+def _load_model(model_path, mtime_ns, size):
+    # mtime_ns and size are only part of the cache key, so a rewritten file is reloaded
+    rl = RLScheduler([])
+    rl.load_q_table(model_path)
+    return rl.q_table
+
 
+def current_model(model_path=MODEL_PATH):
+    """
+    (q_table, version) of the resident pretrained model, or (None, None).
+    The table is loaded once per version of the file on disk.
+    """
+    if not ensure_binary_model(model_path):
+        return None, None
+    stat = os.stat(model_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    return _load_model(model_path, *version), version
+
+
+class ResultCache:
+    """Thread-safe LRU of schedule results keyed by (dataset hash, algorithm, quantum, model version)."""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+@st.cache_resource
+def result_cache():
+    return ResultCache()
+
+
+def schedule_workload(columns, algorithm, quantum=6, q_table=None):
+    """Run one algorithm on a fresh copy of the workload."""
+    processes = processes_from_columns(columns)
+    if algorithm != "RL":
+        return run_algorithm(algorithm, processes, quantum)
+    rl = RLScheduler(processes)
+    if q_table is not None:
+        rl.q_table = q_table
+    else:
+        rl.train(reward_mode="combined")
+    return rl.schedule()
 
-def display_metrics_table(processes):
-    table = []
-    for p in processes:
-        tat = p.completion - p.arrival
-        wt = tat - p.burst
-        table.append({
-            'PID': p.pid,
-            'Arrival': p.arrival,
-            'Burst': p.burst,
-            'Priority': p.priority,
-            'Completion': p.completion,
-            'Turnaround': tat,
-            'Waiting': wt
-        })
-    df = pd.DataFrame(table)
+
+def _cached_schedule(cache, model, dataset_hash, columns, algorithm, quantum):
+    q_table, version = model if algorithm == "RL" else (None, None)
+    key = (dataset_hash, algorithm, quantum if algorithm == "Round Robin" else None, version)
+    result = cache.get(key)
+    if result is None:
+        result = schedule_workload(columns, algorithm, quantum, q_table)
+        cache.put(key, result)
+    return result
+
+
+def cached_schedule(dataset_hash, columns, algorithm, quantum=6):
+    model = current_model() if algorithm == "RL" else (None, None)
+    return _cached_schedule(result_cache(), model, dataset_hash, columns, algorithm, quantum)
+
+
+def compare_algorithms(dataset_hash, columns, algorithms, quantum=6):
+    """
+    cached_schedule for every algorithm. The schedulers are pure Python and hold
+    the GIL, so they run one after another; reruns are served from the cache.
+    """
+    cache = result_cache()
+    model = current_model()
+    return {algorithm: _cached_schedule(cache, model, dataset_hash, columns, algorithm, quantum)
+            for algorithm in algorithms}
+
+
+def ensure_binary_model(model_path=MODEL_PATH, legacy_path=LEGACY_MODEL_PATH):
+    # One-time migration of the YAML Q-table to the binary format
+    if not os.path.exists(model_path) and os.path.exists(legacy_path):
+        convert_yaml_q_table(legacy_path, model_path)
+    return os.path.exists(model_path)
+
+
+def display_metrics_table(processes, gantt=None):
+    columns = schedule_columns(processes)
+    times = process_times(columns)
+    df = pd.DataFrame({
+        'PID': [p.pid for p in processes] if isinstance(processes, list) else processes.pid,
+        'Arrival': columns['arrival'],
+        'Burst': columns['burst'],
+        'Priority': columns['priority'],
+        'Completion': columns['completion'],
+        'Turnaround': times['turnaround'],
+        'Waiting': times['waiting'],
+    })
     st.write("### First 5 Records")
     st.dataframe(df.head())
     st.write("### Summary of Last 5 Records")
     st.dataframe(df.tail())
-    return calculate_metrics(processes)
+
+    metrics = schedule_metrics(columns, gantt)
+    st.write("### Latency Percentiles")
+    st.dataframe(pd.DataFrame({name.capitalize(): metrics[name] for name in TIMES}).T)
+    st.write("### Waiting Time by Priority")
+    st.dataframe(pd.DataFrame({
+        priority: dict(Count=group['count'], **group['waiting'])
+        for priority, group in metrics['per_priority'].items()
+    }).T)
+    if gantt is not None:
+        st.write(f"**Throughput:** {metrics['throughput']:.4f} processes/unit time, "
+                 f"**CPU Utilization:** {metrics['utilization']:.1%}, **Idle Time:** {metrics['idle_time']}")
+    return metrics['turnaround']['mean'], metrics['waiting']['mean']
 
 
-def run_algorithm(algorithm, processes, quantum=6):
+def run_algorithm(algorithm, processes, quantum=6, dataset_hash=None):
     if algorithm == "FCFS":
         return fcfs(processes)
     elif algorithm == "SJF":
@@ -57,40 +186,47 @@ def run_algorithm(algorithm, processes, quantum=6):
     elif algorithm == "Priority":
         return priority_scheduling(processes)
     elif algorithm == "RL":
-        rl = RLScheduler(processes)
+        rl = RLScheduler(processes, memory_cap=MODEL_MEMORY_CAP)
         use_pretrained = st.sidebar.checkbox("Use Pretrained RL Model (Q-Table)", value=True)
         retrain_model = st.sidebar.button("Retrain RL Model with Random Datasets")
+        retrain_seed = st.sidebar.number_input("Retraining Seed", 0, 2 ** 31 - 1, 0)
         show_training_graph = st.sidebar.checkbox("Show Training Graph", value=True)
-        model_path = "general_q_table.yaml"
+        model_path = MODEL_PATH
 
         reward_history = []
 
         if retrain_model:
             st.info("Training RL Agent on Multiple Random Datasets...")
-            all_process_sets = [
-                [Process(pid=j + 1, arrival=random.randint(0, 30), burst=random.randint(1, 10), priority=random.randint(1, 5)) for j in range(random.randint(10, 20))]
-                for _ in range(100)
-            ]
+            all_process_sets = training_datasets(seed=int(retrain_seed))
             progress = st.progress(0)
-            for idx, processes_batch in enumerate(all_process_sets):
-                trainer = RLScheduler(processes_batch, episodes=200)
-                trainer.train(log_rewards=reward_history, reward_mode="combined")
-                rl.q_table.update(trainer.q_table)
-                progress.progress((idx + 1) / len(all_process_sets))
-            rl.save_q_table_yaml(model_path)
-            st.success("RL Model retrained and saved to general_q_table.yaml")
+            trained = train_parallel(all_process_sets, episodes=200, reward_mode="combined",
+                                     log_rewards=reward_history,
+                                     progress=lambda done, total: progress.progress(done / total))
+            rl.q_table.merge(trained)
+            evicted = rl.q_table.evict(max_bytes=MODEL_MEMORY_CAP)
+            rl.save_q_table(model_path)
+            st.success(f"RL Model retrained and saved to {model_path}"
+                       + (f" ({evicted} rarely visited states evicted)" if evicted else ""))
 
         if use_pretrained:
-            if os.path.exists(model_path):
-                rl.load_q_table_yaml(model_path)
+            q_table, _ = current_model(model_path)
+            if q_table is not None:
+                rl.q_table = q_table
                 st.success("Pretrained Q-Table loaded.")
             else:
                 st.error("Pretrained Q-Table not found. Please train a model first.")
                 return processes, []
         else:
-            rl.train(log_rewards=reward_history, reward_mode="combined")
-            rl.save_q_table_yaml(model_path)
-            st.success("Trained new Q-Table and saved.")
+            checkpoint = TrainingCheckpoint(os.path.join(CHECKPOINT_DIR, dataset_hash)) if dataset_hash else None
+            report = rl.train(log_rewards=reward_history, reward_mode="combined",
+                              epsilon_schedule=ExponentialDecay(rl.epsilon), convergence=ConvergenceMonitor(),
+                              checkpoint=checkpoint)
+            rl.save_q_table(model_path)
+            if checkpoint is not None:
+                shutil.rmtree(checkpoint.directory, ignore_errors=True)
+            converged = f"converged at episode {report.converged_at}" if report.converged_at else "did not converge"
+            st.success(f"Trained new Q-Table and saved ({report.episodes} episodes, {converged}, "
+                       f"{report.episodes_per_second:.0f} episodes/s).")
 
         if show_training_graph and reward_history:
             st.write("### RL Training Reward History")
@@ -106,14 +242,18 @@ def run_algorithm(algorithm, processes, quantum=6):
         raise ValueError("Unsupported Algorithm")
 
 
-def generate_random_dataset(n=100):
-    data = []
-    for i in range(1, n + 1):
-        arrival = random.randint(0, 50)
-        burst = random.randint(1, 20)
-        priority = random.randint(1, 10)
-        data.append({'pid': i, 'arrival': arrival, 'burst': burst, 'priority': priority})
-    return pd.DataFrame(data)
+def generate_random_dataset(n=100, seed=None, **params):
+    return generate_frame(n, seed, **params)
+
+
+def training_datasets(count=100, seed=0):
+    """Small overloaded workloads (10-20 processes, bursts 1-10, priorities 1-5) for retraining."""
+    sizes = np.random.default_rng(seed).integers(10, 21, count)
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    return [
+        processes_from_columns(generate_columns(int(size), child, bursts="uniform", mean_burst=5.5, load=2.5))
+        for size, child in zip(sizes, seeds)
+    ]
 
 
 st.title("Process Scheduling Simulator")
@@ -125,11 +265,21 @@ df = None
 if input_method == "Upload CSV":
     uploaded_file = st.sidebar.file_uploader("Upload process dataset CSV", type=["csv"])
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
+        df = read_uploaded_csv(uploaded_file.getvalue())
         st.success("CSV Loaded Successfully!")
 elif input_method == "Generate Random Dataset":
-    count = st.sidebar.slider("Number of Processes", 10, 100, 50)
-    df = generate_random_dataset(count)
+    count = st.sidebar.number_input("Number of Processes", 10, 100000, 50)
+    seed = st.sidebar.number_input("Seed", 0, 2 ** 31 - 1, 0)
+    arrivals = st.sidebar.selectbox("Arrivals", ARRIVALS)
+    bursts = st.sidebar.selectbox("Burst Distribution", BURSTS, index=BURSTS.index("lognormal"))
+    load = st.sidebar.slider("Offered Load", 0.1, 3.0, 0.9)
+    params = (int(count), int(seed), arrivals, bursts, load)
+    # Keep the dataset across reruns so cached results stay valid
+    if st.session_state.get("random_params") != params:
+        st.session_state["random_df"] = generate_random_dataset(int(count), int(seed), arrivals=arrivals,
+                                                                bursts=bursts, load=load)
+        st.session_state["random_params"] = params
+    df = st.session_state["random_df"]
     st.success("Random Dataset Generated!")
 else:
     st.sidebar.write("Enter Process Data:")
@@ -147,40 +297,39 @@ algorithm_options = ["FCFS", "SJF", "Round Robin", "Priority", "RL"]
 mode = st.radio("Choose Simulation Mode", ["Single Algorithm", "Compare All Algorithms"])
 
 if df is not None and not df.empty:
-    processes = parse_process_df(df)
+    dataset_hash, columns = parse_workload(df)
     if mode == "Single Algorithm":
         selected_algo = st.selectbox("Select Scheduling Algorithm", algorithm_options)
         quantum = 6
         if selected_algo == "Round Robin":
             quantum = st.slider("Quantum Time", 1, 10, 6)
-        scheduled, gantt = run_algorithm(selected_algo, processes, quantum)
-        avg_tat, avg_wt = display_metrics_table(scheduled)
+        if selected_algo == "RL":
+            # The RL path owns training widgets and side effects, so it is not cached
+            scheduled, gantt = run_algorithm(selected_algo, processes_from_columns(columns), quantum, dataset_hash)
+        else:
+            scheduled, gantt = cached_schedule(dataset_hash, columns, selected_algo, quantum)
+        avg_tat, avg_wt = display_metrics_table(scheduled, gantt)
         st.write(f"**{selected_algo} - Average Turnaround Time:** {avg_tat:.2f}")
         st.write(f"**{selected_algo} - Average Waiting Time:** {avg_wt:.2f}")
 
-        if len(gantt) <= 20:
-            st.write("### Gantt Chart")
-            fig, ax = plt.subplots()
-            plot_gantt_chart(gantt, title=f"Gantt Chart - {selected_algo}", ax=ax, fig=fig)
-            st.pyplot(fig)
-        else:
-            st.info("Gantt chart is only shown for 20 or fewer processes to maintain clarity.")
+        st.write("### Gantt Chart")
+        window = None
+        if gantt:
+            t_min = min(entry[1] for entry in gantt)
+            t_max = max(entry[2] for entry in gantt)
+            if t_max > t_min:
+                window = st.slider("Time Window", t_min, t_max, (t_min, t_max))
+        max_slices = st.number_input("Max slices before aggregating by time", 100, 1000000, DEFAULT_MAX_SLICES,
+                                     step=1000)
+        fig, ax = plt.subplots()
+        plot_gantt_chart(gantt, title=f"Gantt Chart - {selected_algo}", ax=ax, fig=fig, window=window,
+                         max_slices=max_slices)
+        st.pyplot(fig)
     else:
         result_data = []
+        results = compare_algorithms(dataset_hash, columns, algorithm_options, quantum=6)
         for algo in algorithm_options:
-            proc_copy = parse_process_df(df)
-            if algo == "Round Robin":
-                scheduled, _ = run_algorithm(algo, proc_copy, quantum=6)
-            elif algo == "RL":
-                rl = RLScheduler(proc_copy)
-                model_path = "general_q_table.yaml"
-                if os.path.exists(model_path):
-                    rl.load_q_table_yaml(model_path)
-                    scheduled, _ = rl.schedule()
-                else:
-                    scheduled, _ = run_algorithm(algo, proc_copy)
-            else:
-                scheduled, _ = run_algorithm(algo, proc_copy)
+            scheduled, _ = results[algo]
             avg_tat, avg_wt = calculate_metrics(scheduled)
             result_data.append({"Algorithm": algo, "Avg TAT": avg_tat, "Avg WT": avg_wt})
         result_df = pd.DataFrame(result_data)
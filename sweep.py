@@ -0,0 +1,392 @@
+"""
+Parameter sweeps for the Round Robin quantum and RLScheduler hyperparameters.
+
+    python sweep.py data/*.csv --algorithm rr --grid quantum=1,2,4,6,8,16
+    python sweep.py traces/ --algorithm rl --random 30 alpha=0.01:0.5 gamma=0.8:0.99 epsilon=0.05:0.3 episodes=100,300,1000
+    python sweep.py traces/ --algorithm rl --halving 27 --eta 3 alpha=0.01:0.5 epsilon=0.05:0.3 --out sweep.csv
+
+A search space maps parameter names to a list of values ("a,b,c") or, for
+random and successive-halving search, a range ("low:high", integers if both
+ends are). rr takes quantum and cores, fcfs, sjf and priority take cores, and
+rl takes episodes, alpha, gamma, epsilon and reward_mode; any other parameter
+is an error. Every configuration is run on all workloads and scored by the
+waiting times of all their processes together: mean, p99, and the compute cost
+in seconds (for rl that includes training). Successive halving starts every
+sampled configuration on a prefix of each workload and promotes the best
+1/eta, by --objective, to eta times as many processes, up to the full workloads.
+
+Workloads are parsed once per worker process and kept sorted by arrival, so
+every run starts from ready arrays whose arrival ordering is already done.
+Unreadable or empty workloads are skipped; a sweep with none left is an error.
+Results are cached on disk under --cache-dir, keyed by the hash of the
+workload contents, the algorithm, its parameters (defaults filled in, so
+leaving one out and giving its default share an entry), the workload fraction
+and the seed; a repeated sweep only runs configurations it has not seen. The
+report lists each configuration and marks the Pareto front of
+(mean waiting, p99 waiting, cost).
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from loader import load_columns
+from metrics import process_times, schedule_columns, summarize
+from process import ProcessTable
+from runner import find_workloads, run_once
+
+OBJECTIVES = ("waiting_mean", "waiting_p99", "seconds")
+RL_PARAMS = ("episodes", "alpha", "gamma", "epsilon", "reward_mode")
+# Parameters each algorithm accepts
+PARAMS = {"fcfs": ("cores",), "sjf": ("cores",), "priority": ("cores",), "rr": ("quantum", "cores"), "rl": RL_PARAMS}
+# What the schedulers use for a parameter a configuration leaves out
+DEFAULTS = {"quantum": 6, "cores": 1, "episodes": 1000, "alpha": 0.1, "gamma": 0.95, "epsilon": 0.2,
+            "reward_mode": "waiting"}
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = ".sweep_cache"
+
+# Per process: the workload paths loaded, and their columns sorted by arrival
+_loaded = {"paths": None, "workloads": []}
+
+
+def _load_workloads(paths):
+    """Parse the workloads once per process; unreadable or empty ones are skipped."""
+    paths = tuple(paths)
+    if _loaded["paths"] == paths:
+        return
+    workloads = []
+    for path in paths:
+        try:
+            columns = load_columns(path)
+        except (OSError, ValueError):
+            continue
+        if not len(columns["pid"]):
+            continue
+        order = np.argsort(columns["arrival"], kind="stable")
+        workloads.append({name: np.ascontiguousarray(column[order]) for name, column in columns.items()})
+    _loaded["paths"] = paths
+    _loaded["workloads"] = workloads
+
+
+def workloads_hash(paths, block=1 << 20):
+    """Digest of the workload files' bytes, in order."""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(block), b""):
+                digest.update(data)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def grid(space):
+    """Every combination of the value lists in space."""
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Grid search needs a list of values for {name}, not a range")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def sample(space, n, seed=None):
+    """n configurations drawn from space: lists are sampled uniformly, (low, high) ranges uniformly in between."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                config[name] = values[int(rng.integers(len(values)))]
+            elif all(isinstance(v, int) for v in values):
+                config[name] = int(rng.integers(values[0], values[1] + 1))
+            else:
+                config[name] = float(rng.uniform(values[0], values[1]))
+        configs.append(config)
+    return configs
+
+
+def check_params(algorithm, params):
+    """Reject parameters the algorithm would ignore, so no two configs silently run the same."""
+    if algorithm not in PARAMS:
+        raise ValueError(f"Unsupported algorithm {algorithm!r}; expected one of {tuple(PARAMS)}")
+    unknown = set(params) - set(PARAMS[algorithm])
+    if unknown:
+        raise ValueError(f"Unknown {algorithm} parameters {sorted(unknown)}; expected some of {PARAMS[algorithm]}")
+
+
+def full_params(algorithm, params):
+    """Every parameter the algorithm takes, with DEFAULTS for those params leaves out."""
+    return {name: params.get(name, DEFAULTS[name]) for name in PARAMS[algorithm]}
+
+
+def _run(table, algorithm, params, seed):
+    check_params(algorithm, params)
+    params = full_params(algorithm, params)
+    if algorithm != "rl":
+        return run_once(table, algorithm, quantum=params.get("quantum", DEFAULTS["quantum"]), cores=params["cores"])
+
+    import random
+
+    from scheduler.rl_scheduler import RLScheduler
+
+    random.seed(seed)
+    rl = RLScheduler(table, **{name: value for name, value in params.items() if name != "reward_mode"})
+    rl.train(reward_mode=params["reward_mode"])
+    return rl.schedule()
+
+
+def evaluate(algorithm, params, fraction=1.0, seed=0):
+    """
+    Run one configuration on the first fraction of every loaded workload.
+    Returns waiting_mean, waiting_p99 over all their processes and seconds spent.
+    """
+    if not _loaded["workloads"]:
+        raise ValueError(f"None of the workloads {list(_loaded['paths'] or ())} could be loaded")
+    waiting = []
+    seconds = 0.0
+    for columns in _loaded["workloads"]:
+        n = max(int(np.ceil(len(columns["pid"]) * fraction)), 1)
+        table = ProcessTable.from_columns({name: column[:n] for name, column in columns.items()})
+        started = time.perf_counter()
+        processes, _ = _run(table, algorithm, params, seed)
+        seconds += time.perf_counter() - started
+        waiting.append(process_times(schedule_columns(processes))["waiting"])
+    summary = summarize(np.concatenate(waiting), percentiles=(99,))
+    return {"waiting_mean": summary["mean"], "waiting_p99": summary["p99"], "seconds": seconds}
+
+
+class ResultCache:
+    """One JSON file per evaluated configuration under directory; None disables caching."""
+
+    def __init__(self, directory, dataset_hash):
+        self.directory = directory
+        self.dataset_hash = dataset_hash
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, algorithm, params, fraction, seed):
+        key = json.dumps({"version": CACHE_VERSION, "data": self.dataset_hash, "algorithm": algorithm,
+                          "params": full_params(algorithm, params), "fraction": fraction, "seed": seed},
+                         sort_keys=True)
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def get(self, algorithm, params, fraction, seed):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(algorithm, params, fraction, seed)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, algorithm, params, fraction, seed, result):
+        if self.directory is None:
+            return
+        path = self._path(algorithm, params, fraction, seed)
+        # Write then rename, so a concurrent sweep never reads half a file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+
+
+class Sweep:
+    """Evaluates configurations of one algorithm on a fixed set of workloads, in parallel and through the cache."""
+
+    def __init__(self, workloads, algorithm, workers=None, cache_dir=DEFAULT_CACHE_DIR, seed=0):
+        self.workloads = list(workloads)
+        self.algorithm = algorithm
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.cache = ResultCache(cache_dir, workloads_hash(self.workloads) if cache_dir is not None else None)
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def run(self, configs, fraction=1.0):
+        """One result dict per config, in order: its params, fraction, metrics and whether it came from the cache."""
+        for params in configs:
+            check_params(self.algorithm, params)
+        results = [None] * len(configs)
+        missing = []
+        for i, params in enumerate(configs):
+            cached = self.cache.get(self.algorithm, params, fraction, self.seed)
+            if cached is not None:
+                results[i] = dict(cached, params=params, cached=True)
+            else:
+                missing.append(i)
+
+        if self.workers == 1 or len(missing) <= 1:
+            if missing:
+                _load_workloads(self.workloads)
+            computed = [evaluate(self.algorithm, configs[i], fraction, self.seed) for i in missing]
+        else:
+            if self.pool is None:
+                # Each worker parses the workloads once and keeps them for every later run
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_load_workloads,
+                                                initargs=(self.workloads,))
+            computed = self.pool.map(evaluate, *zip(*((self.algorithm, configs[i], fraction, self.seed)
+                                                      for i in missing)))
+
+        for i, metrics in zip(missing, computed):
+            result = {"params": configs[i], "fraction": fraction, **metrics}
+            self.cache.put(self.algorithm, configs[i], fraction, self.seed, result)
+            results[i] = dict(result, cached=False)
+        return results
+
+    def successive_halving(self, configs, eta=3, objective="waiting_mean", min_fraction=None):
+        """
+        Evaluate configs on small workload prefixes and keep the best 1/eta each
+        round on eta times more data, until the survivors run on full workloads.
+        Returns the results of every round; the last ones are full-size.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unsupported objective {objective!r}; expected one of {OBJECTIVES}")
+        rounds = max(int(np.floor(np.log(max(len(configs), 1)) / np.log(eta) + 1e-9)), 0)
+        fraction = min_fraction if min_fraction is not None else float(eta) ** -rounds
+        history = []
+        while True:
+            fraction = min(fraction, 1.0)
+            results = self.run(configs, fraction)
+            history.extend(results)
+            if fraction >= 1.0:
+                return history
+            keep = max(len(configs) // eta, 1)
+            ranked = sorted(range(len(configs)), key=lambda i: results[i][objective])
+            configs = [configs[i] for i in ranked[:keep]]
+            fraction *= eta
+
+
+def pareto_front(results, keys=("waiting_mean", "waiting_p99", "seconds")):
+    """Indexes of results no other result beats or ties on every key while beating it on one."""
+    points = np.array([[result[key] for key in keys] for result in results], dtype=np.float64).reshape(len(results), len(keys))
+    front = []
+    for i, point in enumerate(points):
+        dominated = np.any(np.all(points <= point, axis=1) & np.any(points < point, axis=1))
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def report(results):
+    """Full-size results sorted by mean waiting time, with a pareto flag."""
+    final = [result for result in results if result["fraction"] >= 1.0]
+    front = set(pareto_front(final))
+    rows = [dict(result, pareto=i in front) for i, result in enumerate(final)]
+    rows.sort(key=lambda row: (row["waiting_mean"], row["waiting_p99"], row["seconds"]))
+    return rows
+
+
+def _parse_value(text):
+    for parse in (int, float):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_space(items):
+    """{"name": [values]} or {"name": (low, high)} from "name=a,b,c" / "name=low:high" items."""
+    space = {}
+    for item in items:
+        name, sep, spec = item.partition("=")
+        if not sep or not spec:
+            raise ValueError(f"Expected name=values or name=low:high, got {item!r}")
+        if ":" in spec:
+            low, high = (_parse_value(v) for v in spec.split(":", 1))
+            space[name] = (low, high)
+        else:
+            space[name] = [_parse_value(v) for v in spec.split(",")]
+    return space
+
+
+def write_report(rows, path):
+    flat = [{**row["params"], **{k: v for k, v in row.items() if k != "params"}} for row in rows]
+    if path.lower().endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(flat, f, indent=2)
+        return
+    import csv
+
+    fields = list(dict.fromkeys(name for row in flat for name in row)) or ["waiting_mean"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, restval="")
+        writer.writeheader()
+        writer.writerows(flat)
+
+
+def print_report(rows):
+    for row in rows:
+        params = " ".join(f"{name}={value:.4g}" if isinstance(value, float) else f"{name}={value}"
+                          for name, value in row["params"].items())
+        mark = "*" if row["pareto"] else " "
+        print(f"{mark} {params or '(defaults)'}: mean waiting {row['waiting_mean']:.2f}, "
+              f"p99 {row['waiting_p99']:.2f}, {row['seconds']:.3f}s{' (cached)' if row['cached'] else ''}")
+    print("* Pareto front of mean waiting, p99 waiting and compute cost")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workloads", nargs="+", help="workload files or directories")
+    parser.add_argument("--algorithm", required=True, choices=tuple(PARAMS))
+    parser.add_argument("--grid", nargs="*", default=None, metavar="NAME=VALUES", help="grid search space")
+    parser.add_argument("--random", nargs="+", metavar=("N", "NAME=SPACE"), help="N random configurations")
+    parser.add_argument("--halving", nargs="+", metavar=("N", "NAME=SPACE"),
+                        help="successive halving over N random configurations")
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="waiting_mean", help="halving ranking")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--out", help="report .csv or .json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    searches = [args.grid is not None, args.random is not None, args.halving is not None]
+    if sum(searches) != 1:
+        raise ValueError("Give exactly one of --grid, --random or --halving")
+
+    workloads = find_workloads(args.workloads)
+    started = time.perf_counter()
+    with Sweep(workloads, args.algorithm, args.workers, None if args.no_cache else args.cache_dir,
+               args.seed) as sweep:
+        if args.grid is not None:
+            results = sweep.run(grid(parse_space(args.grid)))
+        else:
+            n, *items = args.random if args.random is not None else args.halving
+            configs = sample(parse_space(items), int(n), args.seed)
+            if args.random is not None:
+                results = sweep.run(configs)
+            else:
+                results = sweep.successive_halving(configs, args.eta, args.objective)
+
+    rows = report(results)
+    print_report(rows)
+    runs = sum(not result["cached"] for result in results)
+    print(f"{len(results)} evaluations ({runs} run, {len(results) - runs} cached) in "
+          f"{time.perf_counter() - started:.1f}s")
+    if args.out:
+        write_report(rows, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+
+from loader import processes_from_columns
+from scheduler.checkpoint import TrainingCheckpoint
+from scheduler.convergence import ConvergenceMonitor
+from scheduler.q_table import QTable
+from scheduler.rl_scheduler import RLScheduler
+from workload_generator import generate_columns
+
+A = (0, 2, 5, 3, 7, 1, 0, 2)
+B = (1, 3, 4, 1, 9, 0, 0, 0)
+
+
+def _as_dict(q_table):
+    return {state: (q_table.row_values(row).tolist(), q_table.visits[row, :q_table.widths[row]].tolist())
+            for state, row in q_table.index.items()}
+
+
+def test_rows_interned_without_an_update_are_saved(tmp_path):
+    q_table = QTable()
+    q_table.td_update(q_table.intern(A, 2), 1, 5.0, 0.5)
+    checkpoint = TrainingCheckpoint(str(tmp_path))
+    checkpoint.begin(q_table)
+    checkpoint.save(q_table, 1, 0.2, None)
+
+    # Interned at the saved clock and never updated, like the next state of the last step before a save
+    q_table.intern(B, 3)
+    q_table.td_update(q_table.intern(A, 2), 0, 1.0, 0.5)
+    checkpoint.save(q_table, 2, 0.2, None)
+    checkpoint.close()
+
+    state = TrainingCheckpoint(str(tmp_path)).restore()
+    assert state.episode == 2
+    assert _as_dict(state.q_table) == _as_dict(q_table)
+
+
+def test_resumed_training_matches_uninterrupted_training(tmp_path):
+    processes = processes_from_columns(generate_columns(40, 3, bursts="uniform", mean_burst=5.5, load=2.5))
+
+    random.seed(1)
+    uninterrupted = RLScheduler(processes, episodes=60)
+    rewards = []
+    uninterrupted.train(log_rewards=rewards)
+
+    random.seed(1)
+    RLScheduler(processes, episodes=35).train(checkpoint=TrainingCheckpoint(str(tmp_path), every=1,
+                                                                            compact_bytes=20000))
+    random.seed(2)  # overwritten by the restored RNG state
+    resumed = RLScheduler(processes, episodes=60)
+    resumed_rewards = []
+    resumed.train(log_rewards=resumed_rewards, checkpoint=str(tmp_path))
+
+    assert resumed_rewards == rewards
+    assert _as_dict(resumed.q_table) == _as_dict(uninterrupted.q_table)
+    assert np.array_equal(np.sort(resumed.q_table.last_used[:len(resumed.q_table)]),
+                          np.sort(uninterrupted.q_table.last_used[:len(uninterrupted.q_table)]))
+
+
+def test_resumed_training_keeps_convergence_progress(tmp_path):
+    processes = processes_from_columns(generate_columns(40, 3, bursts="uniform", mean_burst=5.5, load=2.5))
+
+    def monitor():
+        return ConvergenceMonitor(window=5, tolerance=0.05, patience=3, min_episodes=10)
+
+    random.seed(1)
+    uninterrupted = RLScheduler(processes, episodes=200).train(convergence=monitor())
+    assert uninterrupted.converged_at is not None
+
+    random.seed(1)
+    RLScheduler(processes, episodes=uninterrupted.converged_at - 4).train(
+        convergence=monitor(), checkpoint=TrainingCheckpoint(str(tmp_path), every=1))
+    resumed = RLScheduler(processes, episodes=200).train(convergence=monitor(), checkpoint=str(tmp_path))
+    assert resumed.episodes == 4
+    assert resumed.converged_at == uninterrupted.converged_at
+
+    # Resuming a run that already converged trains no further
+    again = RLScheduler(processes, episodes=200).train(convergence=monitor(), checkpoint=str(tmp_path))
+    assert again.episodes == 0
+    assert again.converged_at == uninterrupted.converged_at
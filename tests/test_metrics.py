@@ -0,0 +1,27 @@
+import numpy as np
+
+from metrics import summarize
+
+
+def test_summarize_groups_without_values():
+    values = np.array([1, 2, 3, 10], dtype=np.int64)
+    group = np.array([0, 0, 2, 2])
+
+    overall, groups = summarize(values, group, 4)
+
+    assert overall["mean"] == 4.0 and overall["max"] == 10.0
+    assert groups[0] == {"mean": 1.5, "p50": 1.5, "p95": np.percentile([1, 2], 95),
+                         "p99": np.percentile([1, 2], 99), "max": 2.0}
+    assert groups[1] == groups[3] == {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    assert groups[2]["p50"] == 6.5
+
+
+def test_summarize_matches_np_percentile():
+    rng = np.random.default_rng(0)
+    for values in (rng.integers(0, 50, 5000), rng.integers(0, 10 ** 9, 5000), rng.random(5000) * 100):
+        group = rng.integers(0, 3, len(values))
+        overall, groups = summarize(values, group, 3)
+        for summary, part in zip([overall] + groups, [values] + [values[group == g] for g in range(3)]):
+            expected = np.percentile(part, [50, 95, 99])
+            assert np.allclose([summary["p50"], summary["p95"], summary["p99"]], expected)
+            assert np.isclose(summary["mean"], part.mean()) and summary["max"] == part.max()
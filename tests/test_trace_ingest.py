@@ -0,0 +1,67 @@
+from trace_ingest import iter_event_bursts, iter_schedstat_bursts
+
+
+def _switch(time, prev_pid, prev_state, next_pid):
+    return (f"  task-{prev_pid} [000] {time:.6f}: sched_switch: prev_comm=t prev_pid={prev_pid} prev_prio=120 "
+            f"prev_state={prev_state} ==> next_comm=t next_pid={next_pid} next_prio=120\n")
+
+
+def _wakeup(time, pid):
+    return f"  task-0 [000] {time:.6f}: sched_wakeup: comm=t pid={pid} prio=120 target_cpu=000\n"
+
+
+def _long_running_trace(rows):
+    """pid 1 stays runnable throughout, preempted by `rows` short tasks that each run 1 ms and sleep."""
+    yield _wakeup(0.0, 1)
+    yield _switch(0.0, 0, "S", 1)
+    time = 0.0
+    for i in range(rows):
+        pid = 2 + i % 50
+        yield _wakeup(time, pid)
+        yield _switch(time, 1, "R", pid)
+        time += 0.001
+        yield _switch(time, pid, "S", 1)
+        time += 0.01
+
+
+def test_long_running_task_keeps_the_reorder_buffer_bounded():
+    rows = 20000
+    finished = 0
+
+    def lines():
+        nonlocal finished
+        for line in _long_running_trace(rows):
+            if "prev_state=S" in line:
+                finished += 1
+            yield line
+
+    released = 0
+    most_buffered = 0
+    bursts = []
+    for burst in iter_event_bursts(lines(), max_age=1.0):
+        released += 1
+        most_buffered = max(most_buffered, finished - released)
+        bursts.append(burst)
+
+    # Roughly the short tasks arriving within max_age of the latest event, not the whole trace
+    assert most_buffered < 200
+    arrivals = [arrival for arrival, _, _ in bursts]
+    assert arrivals == sorted(arrivals)
+    assert sum(1 for _, burst, _ in bursts if abs(burst - 0.001) < 1e-9) == rows
+    # The split bursts of pid 1 still add up to all of its CPU time
+    assert abs(sum(burst for _, burst, _ in bursts) - (rows * 0.011 - 0.01)) < 1e-4
+
+
+def test_schedstat_pid_missing_from_snapshots_keeps_arrival_order():
+    lines = [
+        "# 1.0", "1 100 0 1 0", "2 100 0 1 5",
+        "# 2.0", "1 300 0 2 0",  # pid 2 skips two snapshots
+        "# 3.0", "1 600 0 3 0",
+        "# 4.0", "1 700 0 4 0", "2 900 0 2 5",
+    ]
+    rows = list(iter_schedstat_bursts(lines))
+
+    arrivals = [arrival for arrival, _, _ in rows]
+    assert arrivals == sorted(arrivals)
+    assert [(arrival, round(burst * 1e9), prio) for arrival, burst, prio in rows] == [
+        (1.0, 200, 120), (1.0, 800, 125), (2.0, 300, 120), (3.0, 100, 120)]
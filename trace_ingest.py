@@ -0,0 +1,317 @@
+"""
+Streaming conversion of Linux scheduler traces into the pid,arrival,burst,priority schema.
+
+    python trace_ingest.py sched.txt data/prod_trace.csv                 # perf sched script / ftrace text
+    python trace_ingest.py schedstat.log out.csv --format schedstat --time-unit 1e-3
+
+Event traces ("perf sched script" output, or ftrace text from trace/trace_pipe;
+optionally gzip-compressed) are read line by line. Each CPU burst of a task
+becomes one process:
+
+    arrival  = the sched_wakeup/sched_wakeup_new that made it runnable (or the
+               first switch-in if the wakeup is not in the trace)
+    burst    = time on CPU until it switches out in a sleeping state (S, D, ...);
+               preemptions (prev_state R/R+) keep the burst open
+    priority = nice, i.e. kernel prio - 120 (real-time tasks come out below -20)
+
+A burst still open max_age seconds after its arrival (a CPU-bound task that
+is only ever preempted, or one left runnable) is split: the time so far
+becomes one process and the rest continues as a new burst arriving then.
+
+Schedstat logs are periodic snapshots of /proc/<pid>/schedstat, each started
+by a timestamp line ("# 1700000000.25" or a bare number) and followed by
+either `grep . /proc/[0-9]*/schedstat` lines (/proc/<pid>/schedstat:run wait
+slices) or "<pid> <run_ns> <wait_ns> <slices> [nice]" lines. CPU time a pid
+gained between two snapshots becomes one process arriving at the earlier one.
+/proc/<pid>/schedstat carries no nice value, so rows from the grep form all
+get priority 0; use the column form with a nice column when priorities
+matter. A pid missing from the snapshots for more than max_age seconds is
+forgotten, so exited pids do not hold rows back.
+
+Times are converted to integer multiples of time_unit seconds (default 1 us),
+relative to the earliest arrival. Rows are released in arrival order once no
+open burst can arrive earlier, so the output suits loader.iter_arrival_batches.
+Since no burst stays open longer than max_age, memory is bounded by the open
+tasks and the rows arriving within max_age of the latest event, never by the
+trace length.
+"""
+
+import argparse
+import functools
+import gzip
+import heapq
+import re
+
+import numpy as np
+
+from loader import COLUMNS, DEFAULT_CHUNK_ROWS, write_csv_chunks
+
+FORMATS = ("auto", "events", "schedstat")
+NICE_0_PRIO = 120
+DEFAULT_MAX_AGE = 10.0
+
+_EVENT = re.compile(r"\s(\d+\.\d+):\s+(?:sched:)?(sched_switch|sched_wakeup_new|sched_wakeup|sched_process_exit):\s*(.*)")
+_FIELD = re.compile(r"(\w+)=(\S+)")
+# perf's compact forms: "comm:pid [prio] state ==> comm:pid [prio]" and "comm:pid [prio] ..."
+_COMPACT_SWITCH = re.compile(r".*:(\d+) \[(\d+)\] (\S+) ==> .*:(\d+) \[(\d+)\]")
+_COMPACT_TASK = re.compile(r".*?:(\d+) \[(\d+)\]")
+_SCHEDSTAT_PROC = re.compile(r"/proc/(\d+)/schedstat:(\d+) (\d+) (\d+)")
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, errors="replace")
+
+
+def parse_event(line):
+    """
+    (timestamp, event, fields) of a scheduler event line, or None. fields maps
+    pid, prio, prev_pid, prev_prio, prev_state, next_pid and next_prio to their
+    raw strings, whichever of perf's output styles the line uses.
+    """
+    if "sched_" not in line:
+        return None
+    match = _EVENT.search(line)
+    if match is None:
+        return None
+    timestamp, event, body = match.groups()
+    fields = dict(_FIELD.findall(body))
+    if event == "sched_switch" and "next_pid" not in fields:
+        compact = _COMPACT_SWITCH.match(body)
+        if compact is None:
+            return None
+        fields = dict(zip(("prev_pid", "prev_prio", "prev_state", "next_pid", "next_prio"), compact.groups()))
+    elif event != "sched_switch" and "pid" not in fields:
+        compact = _COMPACT_TASK.match(body)
+        if compact is None:
+            return None
+        fields = {"pid": compact.group(1), "prio": compact.group(2)}
+    return float(timestamp), event, fields
+
+
+class _Bursts:
+    """Open bursts per task, and finished rows held back until they are the earliest possible."""
+
+    def __init__(self):
+        self.open = {}  # tid -> [arrival, run time, on-CPU since or None, prio]
+        self.open_arrivals = []  # lazy heap of (arrival, tid)
+        self.finished = []  # heap of (arrival, seq, burst, prio)
+        self.seq = 0
+        self.changed = False  # set when a burst ends, the only event that can release rows
+
+    def begin(self, tid, time, prio):
+        if tid not in self.open:
+            self.open[tid] = [time, 0.0, None, prio]
+            heapq.heappush(self.open_arrivals, (time, tid))
+        return self.open[tid]
+
+    def end(self, tid):
+        arrival, run, _, prio = self.open.pop(tid)
+        self.changed = True
+        if run > 0:
+            heapq.heappush(self.finished, (arrival, self.seq, run, prio))
+            self.seq += 1
+
+    def split(self, time, max_age):
+        """End the bursts open since before time - max_age, each continuing as a new burst arriving at time."""
+        while self.open_arrivals and self.open_arrivals[0][0] < time - max_age:
+            arrival, tid = heapq.heappop(self.open_arrivals)
+            state = self.open.get(tid)
+            if state is None or state[0] != arrival:
+                continue
+            on_cpu = state[2]
+            if on_cpu is not None:
+                state[1] += time - on_cpu
+            self.end(tid)
+            self.begin(tid, time, state[3])[2] = None if on_cpu is None else time
+
+    def release(self, flush=False):
+        """Pop finished rows that no open burst can precede."""
+        self.changed = False
+        while self.open_arrivals:
+            arrival, tid = self.open_arrivals[0]
+            state = self.open.get(tid)
+            if state is not None and state[0] == arrival:
+                break
+            heapq.heappop(self.open_arrivals)
+        watermark = None if flush or not self.open_arrivals else self.open_arrivals[0][0]
+        while self.finished and (watermark is None or self.finished[0][0] < watermark):
+            arrival, _, run, prio = heapq.heappop(self.finished)
+            yield arrival, run, prio
+
+
+def iter_event_bursts(lines, max_age=DEFAULT_MAX_AGE):
+    """
+    (arrival, burst, prio) in seconds from perf sched script / ftrace lines, in
+    arrival order. Bursts open for longer than max_age seconds are split.
+    """
+    bursts = _Bursts()
+    time = None
+    for line in lines:
+        event = parse_event(line)
+        if event is None:
+            continue
+        time, name, fields = event
+        if name == "sched_switch":
+            prev_pid = int(fields["prev_pid"])
+            next_pid = int(fields["next_pid"])
+            if prev_pid and prev_pid in bursts.open:
+                state = bursts.open[prev_pid]
+                if state[2] is not None:
+                    state[1] += time - state[2]
+                    state[2] = None
+                if not fields.get("prev_state", "S").startswith("R"):
+                    bursts.end(prev_pid)
+            if next_pid:
+                bursts.begin(next_pid, time, int(fields["next_prio"]))[2] = time
+        elif name == "sched_process_exit":
+            continue
+        else:
+            pid = int(fields["pid"])
+            if pid:
+                bursts.begin(pid, time, int(fields.get("prio", NICE_0_PRIO)))
+        bursts.split(time, max_age)
+        if bursts.changed:
+            yield from bursts.release()
+    for tid, state in bursts.open.items():
+        if state[2] is not None:
+            state[1] += time - state[2]
+    for tid in list(bursts.open):
+        bursts.end(tid)
+    yield from bursts.release(flush=True)
+
+
+def _schedstat_samples(lines):
+    """(timestamp, pid, run_ns, nice) per snapshot line."""
+    timestamp = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.lstrip("#").split()
+        if len(parts) == 1:
+            timestamp = float(parts[0])
+            continue
+        match = _SCHEDSTAT_PROC.match(line)
+        if match is not None:
+            # /proc/<pid>/schedstat has no nice value
+            yield timestamp, int(match.group(1)), int(match.group(2)), 0
+        elif not line.startswith("#") and len(parts) >= 4:
+            yield timestamp, int(parts[0]), int(parts[1]), int(parts[4]) if len(parts) > 4 else 0
+
+
+def iter_schedstat_bursts(lines, max_age=DEFAULT_MAX_AGE):
+    """
+    (arrival, burst, prio) in seconds from schedstat snapshots, in arrival order.
+    A pid missing from the snapshots for more than max_age seconds is forgotten:
+    it no longer holds rows back, and if it shows up again it starts afresh.
+    """
+    last = {}  # pid -> (timestamp, run_ns)
+    seen = []  # lazy heap of (timestamp, pid): the earliest arrival a pid's next row can have
+    rows = []  # heap of (arrival, burst, prio)
+    current = None
+    for timestamp, pid, run_ns, nice in _schedstat_samples(lines):
+        if timestamp is None:
+            raise ValueError("schedstat snapshot lines must follow a timestamp line")
+        if timestamp != current:
+            # A pid's next row arrives at its last snapshot, so rows up to the oldest one are final
+            while seen:
+                seen_at, seen_pid = seen[0]
+                latest = last.get(seen_pid)
+                if latest is not None and latest[0] == seen_at:
+                    if seen_at >= timestamp - max_age:
+                        break
+                    del last[seen_pid]
+                heapq.heappop(seen)
+            while rows and (not seen or rows[0][0] <= seen[0][0]):
+                yield heapq.heappop(rows)
+            current = timestamp
+        previous = last.get(pid)
+        last[pid] = (timestamp, run_ns)
+        heapq.heappush(seen, (timestamp, pid))
+        if previous is not None and run_ns > previous[1]:
+            heapq.heappush(rows, (previous[0], (run_ns - previous[1]) * 1e-9, nice + NICE_0_PRIO))
+    while rows:
+        yield heapq.heappop(rows)
+
+
+def _detect_format(path):
+    with _open(path) as f:
+        for _, line in zip(range(1000), f):
+            if parse_event(line) is not None:
+                return "events"
+            if _SCHEDSTAT_PROC.match(line.strip()):
+                return "schedstat"
+    return "schedstat"
+
+
+def iter_trace_chunks(path, format="auto", time_unit=1e-6, chunk_rows=DEFAULT_CHUNK_ROWS, first_pid=1,
+                      max_age=DEFAULT_MAX_AGE):
+    """
+    Yield column dicts (pid, arrival, burst, priority) of at most chunk_rows
+    processes from a trace file, in arrival order. Bursts shorter than one
+    time_unit are rounded up to 1; event trace bursts open longer than max_age
+    seconds are split, and schedstat pids unseen for that long are forgotten.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported trace format {format!r}; expected one of {FORMATS}")
+    if format == "auto":
+        format = _detect_format(path)
+    parse = functools.partial(iter_event_bursts if format == "events" else iter_schedstat_bursts, max_age=max_age)
+
+    origin = None
+    pid = first_pid
+    with _open(path) as f:
+        rows = parse(f)
+        while True:
+            block = [row for _, row in zip(range(chunk_rows), rows)]
+            if not block:
+                return
+            arrival, burst, prio = (np.array(column, dtype=np.float64) for column in zip(*block))
+            if origin is None:
+                origin = arrival[0]
+            yield {
+                "pid": np.arange(pid, pid + len(block), dtype=np.int64),
+                "arrival": np.floor((arrival - origin) / time_unit + 1e-6).astype(np.int64),
+                "burst": np.maximum(np.rint(burst / time_unit), 1).astype(np.int64),
+                "priority": (prio - NICE_0_PRIO).astype(np.int64),
+            }
+            pid += len(block)
+
+
+def load_trace(path, **params):
+    """A whole trace as columns; params as for iter_trace_chunks."""
+    chunks = list(iter_trace_chunks(path, **params))
+    if not chunks:
+        return {name: np.zeros(0, dtype=np.int64) for name in COLUMNS}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS}
+
+
+def convert_trace(trace_path, out_path, **params):
+    """Stream a trace into a workload CSV. Returns the number of processes written."""
+    return write_csv_chunks(iter_trace_chunks(trace_path, **params), out_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace")
+    parser.add_argument("out", help="output CSV")
+    parser.add_argument("--format", choices=FORMATS, default="auto")
+    parser.add_argument("--time-unit", type=float, default=1e-6, help="seconds per simulator time unit")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE,
+                        help="seconds after which an open event-trace burst is split, "
+                             "or a pid missing from schedstat snapshots is forgotten")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = convert_trace(args.trace, args.out, format=args.format, time_unit=args.time_unit,
+                         chunk_rows=args.chunk_rows, max_age=args.max_age)
+    print(f"Wrote {rows} processes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
+from metrics import averages
+
+
 def calculate_metrics(processes):
-    total_tat = sum(p.completion - p.arrival for p in processes)
-    total_wt = sum(p.completion - p.arrival - p.burst for p in processes)
-    n = len(processes)
-    avg_tat = total_tat / n
-    avg_wt = total_wt / n
-    return avg_tat, avg_wt
+    return averages(processes)
 
 
 def print_metrics(processes):
@@ -1,25 +1,153 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import numpy as np
+from matplotlib.collections import PolyCollection
 
-def plot_gantt_chart(gantt, title="Gantt Chart", ax=None, fig=None):
+from scheduler.round_robin import Cycle
+
+DEFAULT_MAX_SLICES = 20000
+MAX_LABELS = 300
+
+
+def gantt_arrays(gantt, window=None):
+    """
+    Columns (pid, start, end, lane) of a gantt list, keeping only slices that
+    overlap window=(t0, t1) when given. Round Robin Cycle runs are expanded.
+    """
+    plain = [entry for entry in gantt if not isinstance(entry, Cycle)]
+    if plain:
+        data = np.array([tuple(entry) + (0,) * (4 - len(entry)) for entry in plain], dtype=np.int64)
+        pid, start, end, lane = data.T
+    else:
+        pid = start = end = lane = np.zeros(0, dtype=np.int64)
+
+    parts = [(pid, start, end, lane)]
+    for cycle in (entry for entry in gantt if isinstance(entry, Cycle)):
+        k = len(cycle.pids)
+        first, last = 0, k * cycle.repeat
+        if window is not None:
+            first = max(first, (window[0] - cycle.start) // cycle.quantum)
+            last = min(last, -(-(window[1] - cycle.start) // cycle.quantum))
+        if first >= last:
+            continue
+        index = np.arange(first, last)
+        cycle_start = cycle.start + index * cycle.quantum
+        parts.append((np.asarray(cycle.pids, dtype=np.int64)[index % k], cycle_start,
+                      cycle_start + cycle.quantum, np.zeros(len(index), dtype=np.int64)))
+
+    pid, start, end, lane = (np.concatenate(column) for column in zip(*parts))
+    if window is not None:
+        keep = (end > window[0]) & (start < window[1])
+        pid, start, end, lane = pid[keep], start[keep], end[keep], lane[keep]
+    return pid, start, end, lane
+
+
+def _merge_adjacent(pid, start, end, lane):
+    """Join back-to-back slices of the same pid on the same lane (e.g. RR with no contention)."""
+    if not len(pid):
+        return pid, start, end, lane
+    order = np.lexsort((start, lane))
+    pid, start, end, lane = pid[order], start[order], end[order], lane[order]
+    joins = (pid[1:] == pid[:-1]) & (lane[1:] == lane[:-1]) & (start[1:] == end[:-1])
+    first = np.r_[True, ~joins]
+    last = np.r_[~joins, True]
+    return pid[first], start[first], end[last], lane[first]
+
+
+def _aggregate(pid, start, end, lane, t0, t1, buckets):
     """
-    gantt: list of tuples (pid, start_time, end_time)
+    Bucket slices by start time. Each (lane, bucket) becomes one bar, as long as
+    the busy time in the bucket and coloured by the pid that ran longest there.
+    """
+    width = max((t1 - t0) / buckets, 1e-9)
+    bucket = np.minimum(((start - t0) / width).astype(np.int64), buckets - 1)
+    duration = end - start
+
+    order = np.lexsort((pid, bucket, lane))
+    lane, bucket, pid, duration = lane[order], bucket[order], pid[order], duration[order]
+    group = np.r_[True, (lane[1:] != lane[:-1]) | (bucket[1:] != bucket[:-1]) | (pid[1:] != pid[:-1])]
+    starts = np.flatnonzero(group)
+    pid_time = np.add.reduceat(duration, starts)
+    lane, bucket, pid = lane[starts], bucket[starts], pid[starts]
+
+    # Dominant pid per (lane, bucket): last row after sorting by time within the cell
+    cell_order = np.lexsort((pid_time, bucket, lane))
+    lane, bucket, pid, pid_time = lane[cell_order], bucket[cell_order], pid[cell_order], pid_time[cell_order]
+    cell_end = np.r_[(lane[1:] != lane[:-1]) | (bucket[1:] != bucket[:-1]), True]
+    busy = np.add.reduceat(pid_time, np.flatnonzero(np.r_[True, cell_end[:-1]]))
+
+    bar_start = t0 + bucket[cell_end] * width
+    return pid[cell_end], bar_start, bar_start + busy, lane[cell_end]
+
+
+def plot_gantt_chart(gantt, title="Gantt Chart", ax=None, fig=None, window=None, max_slices=DEFAULT_MAX_SLICES,
+                     min_label_px=None):
+    """
+    gantt: list of tuples (pid, start_time, end_time), or (pid, start_time, end_time, core)
+           from the multi-core simulator, which is drawn with one lane per core
     Optional ax, fig: for compatibility with Streamlit's st.pyplot(fig)
+    window: (t0, t1) to zoom into; only the slices overlapping it are drawn
+    max_slices: above this many slices, draw time-bucket aggregates instead
+
+    All bars go into one PolyCollection, and labels are drawn only on bars wide
+    enough to hold them, so large schedules stay cheap to render.
     """
     external_call = ax is not None and fig is not None
+    pid, start, end, lane = gantt_arrays(gantt, window)
+    multicore = next((len(entry) > 3 for entry in gantt if not isinstance(entry, Cycle)), False)
+    cores = (np.unique(lane).tolist() or None) if multicore else None
 
     if not external_call:
-        fig, ax = plt.subplots(figsize=(10, 3))
+        height = 3 if cores is None else max(3, 0.4 * len(cores) + 1)
+        fig, ax = plt.subplots(figsize=(10, height))
+
+    colors = np.array(plt.cm.tab20.colors)  # Up to 20 distinct colors
+    if window is not None:
+        t0, t1 = window
+    else:
+        t0, t1 = (int(start.min()), int(end.max())) if len(start) else (0, 1)
+
+    pid, start, end, lane = _merge_adjacent(pid, start, end, lane)
+    aggregated = len(pid) > max_slices
+    if aggregated:
+        buckets = max(max_slices // max(len(cores or [0]), 1), 1)
+        pid, start, end, lane = _aggregate(pid, start, end, lane, t0, t1, buckets)
+        title = f"{title} (aggregated into {buckets} time buckets)"
 
-    colors = plt.cm.tab20.colors  # Up to 20 distinct colors
+    y = lane.astype(float) if multicore else np.ones(len(pid))
+    left = np.clip(start, t0, t1).astype(float)
+    right = np.clip(end, t0, t1).astype(float)
+    verts = np.stack([
+        np.column_stack([left, y - 0.15]), np.column_stack([left, y + 0.15]),
+        np.column_stack([right, y + 0.15]), np.column_stack([right, y - 0.15]),
+    ], axis=1)
+    edges = 'black' if len(pid) <= 2000 and not aggregated else 'none'
+    ax.add_collection(PolyCollection(verts, facecolors=colors[pid % 20], edgecolors=edges, linewidths=0.5))
+    ax.set_xlim(t0, max(t1, t0 + 1))
 
-    for i, (pid, start, end) in enumerate(gantt):
-        ax.barh(1, end - start, left=start, height=0.3, color=colors[pid % 20], edgecolor='black')
-        ax.text(start + (end - start) / 2, 1, f"P{pid}", ha='center', va='center', color='white', fontsize=5)
+    if not aggregated and len(pid):
+        # Label only bars at least as wide on screen as their text
+        fontsize = 5
+        axes_px = ax.get_window_extent().width
+        px_per_unit = axes_px / max(t1 - t0, 1)
+        if min_label_px is None:
+            min_label_px = (len(str(int(pid.max()))) + 1) * fontsize * 0.6 * fig.dpi / 72
+        wide = np.flatnonzero((right - left) * px_per_unit >= min_label_px)
+        if len(wide) > MAX_LABELS:
+            wide = wide[np.argsort(left[wide] - right[wide], kind="stable")[:MAX_LABELS]]
+        for i in wide.tolist():
+            ax.text((left[i] + right[i]) / 2, y[i], f"P{pid[i]}", ha='center', va='center', color='white',
+                    fontsize=fontsize)
 
-    ax.set_ylim(0.5, 1.5)
+    if cores is None:
+        ax.set_ylim(0.5, 1.5)
+        ax.set_yticks([])
+    else:
+        ax.set_ylim(min(cores) - 0.5, max(cores) + 0.5)
+        ax.set_yticks(cores)
+        ax.set_yticklabels([f"Core {core}" for core in cores])
+        ax.invert_yaxis()
     ax.set_xlabel("Time")
-    ax.set_yticks([])
     ax.set_title(title)
     ax.grid(axis='x')
 
@@ -0,0 +1,190 @@
+"""
+Seeded synthetic workloads for load tests.
+
+    python workload_generator.py data/load_10m.csv -n 10000000 --seed 7 --arrivals bursty --bursts pareto
+    python workload_generator.py load.npy -n 50000000 --priorities 1:0.7 2:0.2 3:0.1
+
+Arrivals are "poisson" (exponential gaps) or "bursty" (clusters of
+--cluster-size arrivals on average with short gaps inside a cluster and long
+gaps between them). Bursts are "uniform", "pareto" or "lognormal" with the
+requested mean, optionally capped. Gaps are scaled so the offered load
+(mean burst / mean gap) is --load.
+
+Every random stream draws from its own child of the seed, so the output depends only
+on the parameters and the seed, not on the chunk size. Rows are generated and
+written a chunk at a time, in arrival order, as CSV with the data/ header
+(pid,arrival,burst,priority) or as a structured .npy readable by loader.py.
+"""
+
+import argparse
+
+import numpy as np
+
+from loader import COLUMNS, DEFAULT_CHUNK_ROWS, DTYPE, detect_format, write_csv_chunks
+
+ARRIVALS = ("poisson", "bursty")
+BURSTS = ("uniform", "pareto", "lognormal")
+DEFAULT_PRIORITIES = {1: 0.2, 2: 0.2, 3: 0.2, 4: 0.2, 5: 0.2}
+
+
+class WorkloadGenerator:
+    def __init__(self, seed=None, arrivals="poisson", bursts="lognormal", mean_burst=10.0, max_burst=None,
+                 burst_shape=None, load=0.9, cluster_size=10.0, cluster_spread=0.1, priorities=None,
+                 first_pid=1, start_time=0):
+        """
+        seed: int or np.random.SeedSequence (e.g. one child per dataset)
+        burst_shape: Pareto tail index (default 1.5) or lognormal sigma (default 1.0)
+        cluster_spread: gap inside a bursty cluster, as a fraction of the mean gap
+        priorities: {priority: weight}, normalized; defaults to 1-5 equally likely
+        """
+        if arrivals not in ARRIVALS:
+            raise ValueError(f"Unsupported arrivals {arrivals!r}; expected one of {ARRIVALS}")
+        if bursts not in BURSTS:
+            raise ValueError(f"Unsupported bursts {bursts!r}; expected one of {BURSTS}")
+        if mean_burst < 1 or load <= 0:
+            raise ValueError("mean_burst must be at least 1 and load positive")
+
+        self.arrivals = arrivals
+        self.bursts = bursts
+        self.mean_burst = mean_burst
+        self.max_burst = max_burst
+        self.burst_shape = burst_shape
+        self.mean_gap = mean_burst / load
+        self.cluster_size = cluster_size
+        self.cluster_spread = cluster_spread
+
+        priorities = DEFAULT_PRIORITIES if priorities is None else priorities
+        self.priority_values = np.array(list(priorities), dtype=np.int64)
+        weights = np.array(list(priorities.values()), dtype=np.float64)
+        self.priority_weights = weights / weights.sum()
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        arrival_seed, cluster_seed, burst_seed, priority_seed = seed.spawn(4)
+        self.arrival_rng = np.random.default_rng(arrival_seed)
+        self.cluster_rng = np.random.default_rng(cluster_seed)
+        self.burst_rng = np.random.default_rng(burst_seed)
+        self.priority_rng = np.random.default_rng(priority_seed)
+        self.next_pid = first_pid
+        self.clock = float(start_time)
+
+    def _gaps(self, n):
+        if self.arrivals == "poisson":
+            return self.arrival_rng.exponential(self.mean_gap, n)
+        # A cluster starts with probability 1 / cluster_size; the long gaps make up
+        # for the short ones so the mean gap, and hence the load, is unchanged
+        starts = self.cluster_rng.random(n) < 1 / self.cluster_size
+        inner = self.mean_gap * self.cluster_spread
+        outer = inner + (self.mean_gap - inner) * self.cluster_size
+        return self.arrival_rng.exponential(1.0, n) * np.where(starts, outer, inner)
+
+    def _bursts(self, n):
+        rng = self.burst_rng
+        if self.bursts == "uniform":
+            high = int(round(2 * self.mean_burst)) - 1
+            burst = rng.integers(1, max(high, 1) + 1, n)
+        elif self.bursts == "pareto":
+            alpha = self.burst_shape or 1.5
+            # Pareto with minimum x_m has mean alpha * x_m / (alpha - 1)
+            x_m = self.mean_burst * (alpha - 1) / alpha if alpha > 1 else 1.0
+            burst = np.ceil((rng.pareto(alpha, n) + 1) * x_m)
+        else:
+            sigma = self.burst_shape or 1.0
+            # Rounding up adds about half a unit on average
+            mean = max(self.mean_burst - 0.5, 0.5)
+            burst = np.ceil(rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, n))
+        burst = np.maximum(burst, 1)
+        if self.max_burst is not None:
+            burst = np.minimum(burst, self.max_burst)
+        return burst.astype(np.int64)
+
+    def chunk(self, n):
+        """The next n processes as columns, continuing the arrival clock and pids."""
+        # Summing from the carried clock keeps results independent of the chunk size
+        arrival = np.cumsum(np.r_[self.clock, self._gaps(n)])[1:]
+        if n:
+            self.clock = float(arrival[-1])
+        columns = {
+            "pid": np.arange(self.next_pid, self.next_pid + n, dtype=np.int64),
+            "arrival": arrival.astype(np.int64),
+            "burst": self._bursts(n),
+            "priority": self.priority_rng.choice(self.priority_values, n, p=self.priority_weights),
+        }
+        self.next_pid += n
+        return columns
+
+    def iter_chunks(self, n, chunk_rows=DEFAULT_CHUNK_ROWS):
+        for start in range(0, n, chunk_rows):
+            yield self.chunk(min(chunk_rows, n - start))
+
+
+def generate_columns(n, seed=None, **params):
+    """A whole workload of n processes as columns; params as for WorkloadGenerator."""
+    return WorkloadGenerator(seed, **params).chunk(n)
+
+
+def generate_frame(n, seed=None, **params):
+    import pandas as pd
+
+    return pd.DataFrame(generate_columns(n, seed, **params), columns=list(COLUMNS))
+
+
+def write_workload(path, n, seed=None, chunk_rows=DEFAULT_CHUNK_ROWS, **params):
+    """
+    Stream n processes to a CSV (data/ schema) or a structured .npy, one chunk
+    in memory at a time. Returns the number of rows written.
+    """
+    generator = WorkloadGenerator(seed, **params)
+    format = detect_format(path)
+    if format == "npy":
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=DTYPE, shape=(n,))
+        row = 0
+        for chunk in generator.iter_chunks(n, chunk_rows):
+            for name in COLUMNS:
+                out[name][row:row + len(chunk[name])] = chunk[name]
+            row += len(chunk["pid"])
+        out.flush()
+        del out
+        return n
+    if format != "csv":
+        raise ValueError(f"Workloads are streamed to .csv or .npy, not {path}")
+    return write_csv_chunks(generator.iter_chunks(n, chunk_rows), path)
+
+
+def _parse_priorities(items):
+    priorities = {}
+    for item in items:
+        priority, _, weight = item.partition(":")
+        priorities[int(priority)] = float(weight or 1)
+    return priorities
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="output .csv or .npy")
+    parser.add_argument("-n", "--processes", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--arrivals", choices=ARRIVALS, default="poisson")
+    parser.add_argument("--bursts", choices=BURSTS, default="lognormal")
+    parser.add_argument("--mean-burst", type=float, default=10.0)
+    parser.add_argument("--max-burst", type=int)
+    parser.add_argument("--burst-shape", type=float, help="Pareto tail index or lognormal sigma")
+    parser.add_argument("--load", type=float, default=0.9, help="offered load, mean burst / mean gap")
+    parser.add_argument("--cluster-size", type=float, default=10.0, help="mean arrivals per bursty cluster")
+    parser.add_argument("--priorities", nargs="+", metavar="PRIORITY:WEIGHT", help="priority mix, e.g. 1:0.7 2:0.3")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    priorities = _parse_priorities(args.priorities) if args.priorities else None
+    rows = write_workload(args.path, args.processes, seed=args.seed, chunk_rows=args.chunk_rows,
+                          arrivals=args.arrivals, bursts=args.bursts, mean_burst=args.mean_burst,
+                          max_burst=args.max_burst, burst_shape=args.burst_shape, load=args.load,
+                          cluster_size=args.cluster_size, priorities=priorities)
+    print(f"Wrote {rows} processes to {args.path}")
+
+
+if __name__ == "__main__":
+    main()